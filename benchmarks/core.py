@@ -0,0 +1,247 @@
+"""Benchmarks for the core Mad Libs operations.
+
+Each benchmark runs against a seeded synthetic library (see corpus.py)
+of every requested size:
+
+* parse    - finding a template's placeholders (Extract Placeholders)
+* render   - filling in a template (Generate Story)
+* save     - writing the library file (Save)
+* load     - reading the library file back (Open / startup)
+* catalog  - scanning a templates directory, cold and then cached
+* lookup   - finding Mad Libs by title
+* index    - adding records to the in-memory search index
+* search   - type-ahead searches against that index, per query
+* sqlite   - converting to a SQLite library, then lookups and searches in it
+
+Results are the best of ``--repeat`` runs, in microseconds per item.
+With ``--baseline`` they are compared to a saved run, and the exit
+status is 1 if any benchmark got slower by more than ``--threshold``.
+
+Usage:
+    python benchmarks/core.py --sizes 10,1000,100000 --save-baseline baseline.json
+    python benchmarks/core.py --sizes 10,1000,100000 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from corpus import generate_fills, generate_templates, write_catalog
+
+from madlibs.engine import PlaceholderIndex, render_template
+from madlibs.catalog import TemplateCatalog
+from madlibs.library import MadLibsLibrary
+from madlibs.search import SearchIndex
+from madlibs.sqlite_store import SQLiteStore
+from madlibs.storage import JournaledStore
+
+LOOKUPS = 100000
+SQLITE_LOOKUPS = 10000
+SEARCHES = ["space", "pir", "[noun]", "haunted [adjective]", "zebra"]
+# Every keystroke of a type-ahead search
+TYPE_AHEAD = [query[:end] for query in ("space adventure", "[noun] haunted", "t")
+              for end in range(1, len(query) + 1)]
+
+
+def best_time(function, repeat):
+    """Best wall time of ``repeat`` calls of ``function``, in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_parse(records, repeat):
+    def run():
+        for record in records:
+            PlaceholderIndex().update(record["template"])
+    return best_time(run, repeat) / len(records)
+
+
+def bench_render(records, fills, repeat):
+    def run():
+        for record, values in zip(records, fills):
+            render_template(record["template"], values)
+    return best_time(run, repeat) / len(records)
+
+
+def bench_save_load(records, workdir, repeat):
+    path = os.path.join(workdir, "madlibs.json")
+    library = MadLibsLibrary(records)
+    save = best_time(lambda: JournaledStore(path, library).save(), repeat)
+    load = best_time(lambda: JournaledStore(path).load(), repeat)
+    return save / len(records), load / len(records)
+
+
+def bench_catalog(records, workdir, repeat):
+    directory = os.path.join(workdir, "templates")
+    write_catalog(directory, records)
+    catalogs = []
+
+    def cold():
+        catalogs.append(TemplateCatalog(directory))
+        catalogs[-1].entries()
+    cold_time = best_time(cold, repeat)
+    warm_time = best_time(catalogs[-1].entries, repeat)
+    shutil.rmtree(directory)
+    return cold_time / len(records), warm_time / len(records)
+
+
+def bench_lookup(records, seed, repeat):
+    library = MadLibsLibrary(records)
+    rng = random.Random(seed)
+    titles = [rng.choice(records)["title"] for _ in range(LOOKUPS)]
+
+    def run():
+        get = library.get
+        for title in titles:
+            get(title)
+    return best_time(run, repeat) / LOOKUPS
+
+
+def bench_search(records, repeat):
+    indexes = []
+
+    def build():
+        indexes[:] = [SearchIndex(records)]
+    index_time = best_time(build, 1)
+
+    def run():
+        search = indexes[0].search
+        for query in TYPE_AHEAD:
+            search(query)
+    return index_time / len(records), best_time(run, repeat) / len(TYPE_AHEAD)
+
+
+def bench_sqlite(records, workdir, seed, repeat):
+    """Import, lookup and search times for a SQLite library"""
+    path = os.path.join(workdir, "madlibs.db")
+
+    def convert():
+        SQLiteStore(path, records).close()
+    import_time = best_time(convert, 1)
+
+    store = SQLiteStore(path)
+    rng = random.Random(seed)
+    titles = [rng.choice(records)["title"] for _ in range(SQLITE_LOOKUPS)]
+
+    def lookups():
+        get = store.library.get
+        for title in titles:
+            get(title)
+
+    def searches():
+        for query in SEARCHES:
+            store.library.search(query)
+    lookup_time = best_time(lookups, repeat)
+    search_time = best_time(searches, repeat)
+    store.close()
+    for name in os.listdir(workdir):
+        if name.startswith("madlibs.db"):
+            os.remove(os.path.join(workdir, name))
+    return import_time / len(records), lookup_time / SQLITE_LOOKUPS, search_time / len(SEARCHES)
+
+
+def run_benchmarks(args):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="madlibs-bench-")
+    try:
+        for size in args.sizes:
+            records = list(generate_templates(size, args.seed, args.min_words, args.max_words))
+            fills = list(generate_fills(records, args.seed))
+
+            def report(name, seconds):
+                key = f"{name}[{size}]"
+                results[key] = seconds * 1e6
+                print(f"{key:24} {results[key]:12.2f} us/item", flush=True)
+
+            report("parse", bench_parse(records, args.repeat))
+            report("render", bench_render(records, fills, args.repeat))
+            save, load = bench_save_load(records, workdir, args.repeat)
+            report("save", save)
+            report("load", load)
+            if size <= args.catalog_max:
+                cold, warm = bench_catalog(records, workdir, args.repeat)
+                report("catalog_cold", cold)
+                report("catalog_warm", warm)
+            report("lookup", bench_lookup(records, args.seed, args.repeat))
+            index, search = bench_search(records, args.repeat)
+            report("index", index)
+            report("search", search)
+            if size <= args.sqlite_max:
+                sqlite_import, sqlite_lookup, sqlite_search = bench_sqlite(
+                    records, workdir, args.seed, args.repeat)
+                report("sqlite_import", sqlite_import)
+                report("sqlite_lookup", sqlite_lookup)
+                report("sqlite_search", sqlite_search)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline; returns the regressed benchmarks"""
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        change = value / old - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:24} {old:12.2f} -> {value:12.2f} us/item ({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="Comma-separated library sizes, 10 to 1000000 (default: 10,1000,100000)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed (default: 1)")
+    parser.add_argument("--min-words", type=int, default=40,
+                        help="Shortest template in words (default: 40)")
+    parser.add_argument("--max-words", type=int, default=160,
+                        help="Longest template in words (default: 160)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per benchmark; the best one counts (default: 3)")
+    parser.add_argument("--catalog-max", type=int, default=10000,
+                        help="Skip the catalog benchmark for larger sizes (default: 10000)")
+    parser.add_argument("--sqlite-max", type=int, default=100000,
+                        help="Skip the SQLite benchmark for larger sizes (default: 100000)")
+    parser.add_argument("--baseline", help="Compare with the results saved in this file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save the results to this file")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = run_benchmarks(args)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks slower than the baseline by more than "
+                  f"{args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Seeded synthetic Mad Libs for the benchmarks.
+
+Templates are stitched together from the sentences of the built-in
+example templates, so they look like real ones: same placeholder
+density, same punctuation, same mix of repeated placeholders. The same
+seed always gives the same corpus.
+"""
+import json
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from madlibs.engine import PLACEHOLDER_PATTERN  # noqa: E402
+from madlibs.examples import EXAMPLE_TEMPLATES  # noqa: E402
+
+_SENTENCE_END = re.compile(r'(?<=[.!?"])\s+')
+
+SEED_TITLES = [example["data"]["title"] for example in EXAMPLE_TEMPLATES]
+SEED_SENTENCES = [sentence
+                  for example in EXAMPLE_TEMPLATES
+                  for sentence in _SENTENCE_END.split(example["data"]["template"])
+                  if sentence.strip()]
+
+
+def generate_templates(count, seed=0, min_words=40, max_words=160):
+    """Yield ``count`` template records with unique titles"""
+    rng = random.Random(seed)
+    for i in range(count):
+        target = rng.randint(min_words, max_words)
+        sentences = []
+        words = 0
+        while words < target:
+            sentence = rng.choice(SEED_SENTENCES)
+            sentences.append(sentence)
+            words += sentence.count(" ") + 1
+        template = " ".join(sentences)
+        yield {
+            "title": f"{rng.choice(SEED_TITLES)} {i + 1}",
+            "template": template,
+            "placeholders": PLACEHOLDER_PATTERN.findall(template),
+        }
+
+
+def generate_fills(records, seed=0):
+    """Yield a mapping of placeholder -> word for each record"""
+    rng = random.Random(seed)
+    words = ["banana", "sparkly", "wobble", "Gerald", "seventeen", "trombone", "quickly"]
+    for record in records:
+        yield {placeholder: rng.choice(words) for placeholder in record["placeholders"]}
+
+
+def write_catalog(directory, records):
+    """Write each record as a template file, like the templates directory"""
+    os.makedirs(directory, exist_ok=True)
+    for i, record in enumerate(records):
+        with open(os.path.join(directory, f"template_{i:07d}.json"), "w") as file:
+            json.dump(record, file, indent=2)
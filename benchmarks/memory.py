@@ -0,0 +1,106 @@
+"""Memory benchmark for an in-memory library.
+
+Measures the resident set size (RSS) taken by a library of ``--size``
+synthetic templates (see corpus.py), or by the records of a saved
+madlibs.json (``--library``), held three ways:
+
+* dicts      - a dict of the plain dicts json produces, as the library
+               stored them before MadLibRecord
+* compact    - a MadLibsLibrary of MadLibRecords
+* searchable - the same plus its SearchIndex, as the GUI keeps it
+
+Each way is measured in a fresh process, as the RSS after loading minus
+the RSS before.
+
+Usage:
+    python benchmarks/memory.py --size 1000000
+    python benchmarks/memory.py --library ~/madlibs.json --modes dicts,compact
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+MODES = ["dicts", "compact", "searchable"]
+
+
+def rss_bytes():
+    """Current RSS from /proc where there is one, otherwise the peak RSS"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(mode, size, seed, library_path):
+    """Load the records one way in this process; returns the measurement"""
+    from corpus import generate_templates
+
+    from madlibs.library import MadLibsLibrary
+    from madlibs.storage import iter_json_array
+
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    file = open(library_path) if library_path else None
+    records = iter_json_array(file) if file else generate_templates(size, seed)
+    if mode == "dicts":
+        library = {record["title"]: record for record in records}
+    else:
+        library = MadLibsLibrary(records, searchable=mode == "searchable")
+        if library.searchable:
+            library.build_search_index()
+    if file:
+        file.close()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = rss_bytes() - before
+    return {"mode": mode, "records": len(library), "rss_bytes": used,
+            "bytes_per_record": used / max(len(library), 1), "load_seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000000,
+                        help="Synthetic templates to load (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed (default: 1)")
+    parser.add_argument("--library", help="Measure the records of this madlibs.json instead")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        help=f"Comma-separated ways to hold the records (default: {','.join(MODES)})")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.size, args.seed, args.library)))
+        return 0
+
+    results = []
+    for mode in args.modes.split(","):
+        command = [sys.executable, os.path.abspath(__file__), "--child", mode,
+                   "--size", str(args.size), "--seed", str(args.seed)]
+        if args.library:
+            command += ["--library", args.library]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        results.append(result)
+        print(f"{mode:12} {result['records']:9d} records {result['rss_bytes'] / 2**20:10.1f} MiB "
+              f"{result['bytes_per_record']:8.0f} B/record {result['load_seconds']:8.1f} s", flush=True)
+
+    baseline = next((result for result in results if result["mode"] == "dicts"), None)
+    if baseline:
+        for result in results:
+            if result is not baseline and result["rss_bytes"] > 0:
+                print(f"dicts / {result['mode']}: "
+                      f"{baseline['rss_bytes'] / result['rss_bytes']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Startup-time benchmark.
+
+Checks three budgets and exits with status 1 if any is exceeded:
+
+* import time of the headless core (``python -X importtime``), and that
+  importing it never pulls in tkinter;
+* time for ``python -m mad_libs_creator render`` to get as far as the
+  headless command line, and that it never pulls in tkinter or the AI
+  client on the way;
+* time from launching the GUI process until its first window is drawn.
+  This part is skipped when no display is available.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--import-budget-ms 30]
+                                 [--entry-budget-ms 50] [--window-budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a headless worker imports
+HEADLESS_MODULES = ["madlibs.cli"]
+
+# Modules the headless entry point must not import
+GUI_MODULES = ["tkinter", "mad_libs_widgets", "madlibs.ai", "madlibs.ai_cache", "madlibs.watchdog"]
+
+# Runs "python -m mad_libs_creator render --help" and reports how long it
+# took and what it imported; --help exits once the command line is reached
+ENTRY_PROBE = """
+import json, runpy, sys, time
+start = time.perf_counter()
+sys.argv = ["mad_libs_creator", "render", "--help"]
+try:
+    runpy.run_module("mad_libs_creator", run_name="__main__", alter_sys=True)
+except SystemExit:
+    pass
+elapsed = (time.perf_counter() - start) * 1000
+sys.stdout = sys.__stdout__
+print(json.dumps({"ms": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+WINDOW_PROBE = """
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("no-display")
+    raise SystemExit
+from mad_libs_creator import MadLibsCreator
+app = MadLibsCreator(root)
+root.update()
+print("shown")
+root.destroy()
+"""
+
+
+def import_time_ms(module):
+    """Cumulative import time of ``module`` in a fresh interpreter, in ms"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000.0
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def imports_tkinter(module):
+    code = f"import sys, {module}; print(any(m.split('.')[0] == 'tkinter' for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip() == "True"
+
+
+def headless_entry():
+    """(milliseconds, GUI modules imported) for the headless command line"""
+    result = subprocess.run([sys.executable, "-c", ENTRY_PROBE], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    probe = json.loads(result.stdout.splitlines()[-1])
+    imported = [module for module in GUI_MODULES if module in probe["modules"]]
+    return probe["ms"], imported
+
+
+def time_to_window_ms():
+    """Milliseconds from process launch until the first window is drawn, or None"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", WINDOW_PROBE], cwd=ROOT,
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline().strip()
+    elapsed = (time.perf_counter() - start) * 1000
+    process.communicate()
+    if line == "no-display":
+        return None
+    if line != "shown":
+        raise RuntimeError(f"The GUI failed to start (exit status {process.returncode})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Runs per measurement; the best one counts (default: 5)")
+    parser.add_argument("--import-budget-ms", type=float, default=30,
+                        help="Budget for importing the headless core (default: 30)")
+    parser.add_argument("--entry-budget-ms", type=float, default=50,
+                        help="Budget for reaching the headless command line (default: 50)")
+    parser.add_argument("--window-budget-ms", type=float, default=1500,
+                        help="Budget for the first GUI window (default: 1500)")
+    args = parser.parse_args()
+
+    ok = True
+    for module in HEADLESS_MODULES:
+        best = min(import_time_ms(module) for _ in range(args.runs))
+        within = best <= args.import_budget_ms
+        ok = ok and within
+        print(f"import {module}: {best:.1f} ms (budget {args.import_budget_ms:.0f} ms)"
+              f"{'' if within else '  OVER BUDGET'}")
+        if imports_tkinter(module):
+            ok = False
+            print(f"import {module}: pulls in tkinter  FAIL")
+
+    runs = [headless_entry() for _ in range(args.runs)]
+    best = min(ms for ms, _ in runs)
+    within = best <= args.entry_budget_ms
+    ok = ok and within
+    print(f"mad_libs_creator render: {best:.1f} ms (budget {args.entry_budget_ms:.0f} ms)"
+          f"{'' if within else '  OVER BUDGET'}")
+    imported = runs[0][1]
+    if imported:
+        ok = False
+        print(f"mad_libs_creator render: imports {', '.join(imported)}  FAIL")
+
+    first = time_to_window_ms()
+    if first is None:
+        print("first window: skipped (no display)")
+    else:
+        best = min([first] + [time_to_window_ms() for _ in range(args.runs - 1)])
+        within = best <= args.window_budget_ms
+        ok = ok and within
+        print(f"first window: {best:.0f} ms (budget {args.window_budget_ms:.0f} ms)"
+              f"{'' if within else '  OVER BUDGET'}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
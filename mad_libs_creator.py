@@ -1,9 +1,71 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import argparse
+import sys
+
+
+def parse_args(argv=None):
+    """Parse the GUI's options; anything left over is a headless command"""
+    from madlibs.cli import add_session_options
+    
+    parser = argparse.ArgumentParser(description="Mad Libs Creator")
+    add_session_options(parser)
+    parser.add_argument("--stalls", metavar="FILE",
+                        help="Watch for event-loop stalls and save a JSON report to FILE on exit")
+    parser.add_argument("--stall-threshold", type=float, default=200, metavar="MS",
+                        help="Report stalls longer than this many milliseconds (default: 200)")
+    return parser.parse_known_args(argv)
+
+
+def run_headless(argv):
+    """Run a headless command, e.g. "python -m mad_libs_creator render ..." """
+    from madlibs.cli import main as cli_main
+    
+    sys.exit(cli_main(argv))
+
+
+if __name__ == "__main__" and parse_args()[1]:
+    # Before tkinter and the GUI's other modules are imported below
+    run_headless(sys.argv[1:])
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+    from mad_libs_widgets import InputForm, VirtualCombobox, VirtualListbox, sync_listbox
+except ImportError:
+    # Servers without Tk can still use the headless commands (see main)
+    tk = ttk = messagebox = filedialog = None
+    InputForm = VirtualCombobox = VirtualListbox = sync_listbox = None
 import json
 import os
-import re
-import sys
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from madlibs import (AIClient, AIError, Autosaver, MadLibsLibrary,
+                     PlaceholderIndex, PlaceholderScanner, RateLimiter, ResponseCache, TemplateCatalog, TemplateParseError,
+                     TitleView, ai_cache, iter_batch, open_store, render_template)
+from madlibs.storage import needs_copy
+from madlibs.ai_batch import failure_record, read_prompts, unique_title
+from madlibs import metrics
+from madlibs.examples import write_example_templates
+from madlibs.watchdog import StallWatchdog
+
+# How often streamed AI output is copied into the window, in milliseconds
+STREAM_FRAME_MS = 30
+
+# Placeholders are extracted this long after the user stops typing, in milliseconds
+PLACEHOLDER_DEBOUNCE_MS = 250
+
+# Search boxes search this long after a keystroke, in milliseconds, so keys
+# typed faster than that cost one search
+SEARCH_DEBOUNCE_MS = 30
+
+# How often a search waiting for the search index checks on it, in milliseconds
+SEARCH_INDEX_POLL_MS = 100
+
+# File types offered by the Open and Save As dialogs
+LIBRARY_FILETYPES = [("JSON Files", "*.json"), ("SQLite Databases", "*.db *.sqlite *.sqlite3"),
+                     ("All Files", "*.*")]
 
 class MadLibsCreator:
     def __init__(self, root):
@@ -17,8 +79,30 @@ class MadLibsCreator:
             "template": "",
             "placeholders": []
         }
-        self.saved_madlibs = []
+        self.saved_madlibs = MadLibsLibrary(searchable=True)
         self.current_file = None
+        self.store = None
+        self.autosaver = None
+        self.loader = None
+        # Save As copies a library to another backend on this thread, and
+        # notes the edits made meanwhile to replay them onto the copy
+        self.copy_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="madlibs-save-as")
+        self.copy_job = None
+        self.copy_changes = None
+        self.template_catalog = TemplateCatalog("templates")
+        
+        # AI requests run here so they never block the Tk event loop
+        self.ai_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="madlibs-ai")
+        self.ai_cancel_event = None
+        self.ai_client = AIClient(cache=ResponseCache())
+        
+        # Status bar for save notifications, fed from the autosave thread
+        self.status_var = tk.StringVar()
+        self.status_messages = queue.Queue()
+        statusbar = ttk.Label(root, textvariable=self.status_var, anchor=tk.W, relief=tk.SUNKEN)
+        statusbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.root.after(100, self.poll_status_messages)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
         
         # Create notebook for tabs
         self.notebook = ttk.Notebook(root)
@@ -35,11 +119,22 @@ class MadLibsCreator:
         self.notebook.add(self.manage_tab, text="Manage")
         self.notebook.add(self.ai_tab, text="AI Generator")  # Add AI tab
         
-        # Setup each tab
+        # Only the Create tab is shown at startup; the others are built the
+        # first time they are selected
+        self.madlib_selector = None
+        self.madlibs_listbox = None
+        # Search box variable and pending search of each list view, and the
+        # titles the view shows while its search box is not empty
+        self.search_vars = {}
+        self.search_jobs = {}
+        self.search_results = {}
+        self.tab_builders = {
+            str(self.play_tab): self.setup_play_tab,
+            str(self.manage_tab): self.setup_manage_tab,
+            str(self.ai_tab): self.setup_ai_tab,
+        }
         self.setup_create_tab()
-        self.setup_play_tab()
-        self.setup_manage_tab()
-        self.setup_ai_tab()  # Setup AI tab
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # Create menu
         self.create_menu()
@@ -57,7 +152,7 @@ class MadLibsCreator:
         file_menu.add_command(label="Save", command=self.save_madlibs)
         file_menu.add_command(label="Save As", command=self.save_as_madlibs)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.quit_app)
         
         menubar.add_cascade(label="File", menu=file_menu)
         
@@ -95,6 +190,11 @@ class MadLibsCreator:
         self.template_text = tk.Text(template_frame, wrap=tk.WORD)
         self.template_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Placeholders are extracted live as the template is edited
+        self.placeholder_index = PlaceholderIndex()
+        self.placeholders_job = None
+        self.template_text.bind("<<Modified>>", self.on_template_modified)
+        
         # Buttons frame
         buttons_frame = ttk.Frame(self.create_tab)
         buttons_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -119,18 +219,26 @@ class MadLibsCreator:
         
         ttk.Label(selection_frame, text="Select a Mad Lib:").pack(side=tk.LEFT, padx=5, pady=5)
         
-        self.madlib_selector = ttk.Combobox(selection_frame, state="readonly")
+        self.madlib_selector = VirtualCombobox(selection_frame, command=self.load_selected_madlib)
         self.madlib_selector.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
-        self.madlib_selector.bind("<<ComboboxSelected>>", self.load_selected_madlib)
         
         # Add a button to load example templates
         example_btn = ttk.Button(selection_frame, text="Try Examples", command=self.load_example_templates)
         example_btn.pack(side=tk.RIGHT, padx=5, pady=5)
         
+        # Type-ahead search narrows down the Mad Libs in the selector
+        search_frame = ttk.Frame(self.play_tab)
+        search_frame.pack(fill=tk.X, padx=10)
+        self.add_search_box(search_frame, self.madlib_selector)
+        
         # Inputs frame
         self.inputs_frame = ttk.LabelFrame(self.play_tab, text="Fill in the blanks")
         self.inputs_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        # Input rows are pooled and reused when another Mad Lib is selected
+        self.input_form = InputForm(self.inputs_frame)
+        self.input_form.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
+        
         # Results frame
         self.results_frame = ttk.LabelFrame(self.play_tab, text="Your Mad Lib Story")
         self.results_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -141,18 +249,23 @@ class MadLibsCreator:
         # Generate button
         generate_btn = ttk.Button(self.play_tab, text="Generate Story", command=self.generate_story)
         generate_btn.pack(padx=10, pady=10)
+        
+        self.madlib_selector.set_items(TitleView(self.saved_madlibs))
+        self.select_first_madlib()
     
     def setup_manage_tab(self):
+        # Search frame
+        search_frame = ttk.Frame(self.manage_tab)
+        search_frame.pack(fill=tk.X, padx=10, pady=5)
+        
         # List frame
         list_frame = ttk.LabelFrame(self.manage_tab, text="Your Mad Libs")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.madlibs_listbox = tk.Listbox(list_frame)
-        self.madlibs_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.madlibs_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.madlibs_listbox.config(yscrollcommand=scrollbar.set)
+        # Only the visible rows are created, so long libraries stay fast
+        self.madlibs_listbox = VirtualListbox(list_frame)
+        self.madlibs_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.add_search_box(search_frame, self.madlibs_listbox)
         
         # Buttons frame
         buttons_frame = ttk.Frame(self.manage_tab)
@@ -163,6 +276,76 @@ class MadLibsCreator:
         
         delete_btn = ttk.Button(buttons_frame, text="Delete", command=self.delete_madlib)
         delete_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.madlibs_listbox.set_items(TitleView(self.saved_madlibs))
+    
+    def on_tab_changed(self, event):
+        self.build_tab(self.notebook.select())
+    
+    def build_tab(self, tab):
+        """Build a tab's widgets if it hasn't been shown yet"""
+        builder = self.tab_builders.pop(str(tab), None)
+        if builder:
+            builder()
+    
+    def title_views(self):
+        """The built widgets that list all of the library's titles"""
+        return [view for view in (self.madlibs_listbox, self.madlib_selector)
+                if view is not None and view not in self.search_results]
+    
+    def add_search_box(self, parent, view):
+        """Add a search box that filters the titles shown in ``view``"""
+        ttk.Label(parent, text="Search:").pack(side=tk.LEFT, padx=5)
+        search_var = self.search_vars[view] = tk.StringVar()
+        search_var.trace_add("write", lambda *args: self.on_search_changed(view))
+        search_entry = ttk.Entry(parent, textvariable=search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+    
+    def on_search_changed(self, view):
+        job = self.search_jobs.pop(view, None)
+        if job:
+            self.root.after_cancel(job)
+        self.search_jobs[view] = self.root.after(SEARCH_DEBOUNCE_MS, lambda: self.update_search(view))
+    
+    @metrics.timed("gui.update_search")
+    def update_search(self, view):
+        """Show the titles matching a view's search box, or all of them if it is empty"""
+        self.search_jobs.pop(view, None)
+        query = self.search_vars[view].get().strip()
+        if query and not self.saved_madlibs.search_ready:
+            # Searching now would scan the whole library on the Tk thread;
+            # try again once the index is built
+            self.set_status("Indexing Mad Libs for search...")
+            self.search_jobs[view] = self.root.after(SEARCH_INDEX_POLL_MS, lambda: self.update_search(view))
+            return
+        selected = view.get() if view is self.madlib_selector else None
+        if query:
+            results = self.search_results[view] = self.saved_madlibs.search(query)
+            view.set_items(results)
+            self.set_status(f"{len(results)} Mad Libs match '{query}'")
+        elif self.search_results.pop(view, None) is not None:
+            view.set_items(TitleView(self.saved_madlibs))
+        else:
+            return
+        
+        if view is self.madlib_selector:
+            # Keep the Mad Lib being played if it is still listed
+            if query and selected in results:
+                view.current(results.index(selected))
+            elif not query and selected in self.saved_madlibs:
+                view.current(self.saved_madlibs.index(selected))
+            self.select_first_madlib()
+    
+    def refresh_search(self):
+        """Search again after the library changed"""
+        for view in list(self.search_results):
+            self.update_search(view)
+    
+    def clear_search(self, view):
+        """Empty a view's search box and list all titles again straight away"""
+        if view in self.search_vars:
+            self.search_vars[view].set("")
+            self.update_search(view)
     
     def setup_ai_tab(self):
         """Setup the AI Generator tab"""
@@ -231,6 +414,11 @@ class MadLibsCreator:
                                   values=["Funny", "Serious", "Mysterious", "Educational", "Silly"], state="readonly", width=10)
         style_combo.pack(side=tk.LEFT, padx=5, pady=5)
         
+        # Repeated prompts come from the cache unless a fresh result is asked for
+        self.fresh_result_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Fresh result (skip cache)", 
+                        variable=self.fresh_result_var).pack(side=tk.LEFT, padx=5, pady=5)
+        
         # Generate button
         generate_frame = ttk.Frame(self.ai_tab)
         generate_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -239,6 +427,17 @@ class MadLibsCreator:
                                       command=self.generate_ai_template)
         self.generate_btn.pack(side=tk.LEFT, padx=5, pady=5)
         
+        self.batch_btn = ttk.Button(generate_frame, text="Batch from File...", 
+                                    command=self.generate_ai_batch)
+        self.batch_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.cancel_btn = ttk.Button(generate_frame, text="Cancel", 
+                                     command=self.cancel_ai_generation, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.ai_progress = ttk.Progressbar(generate_frame, mode="indeterminate", length=100)
+        self.ai_progress.pack(side=tk.LEFT, padx=5, pady=5)
+        
         self.status_label = ttk.Label(generate_frame, text="")
         self.status_label.pack(side=tk.LEFT, padx=10, pady=5, fill=tk.X, expand=True)
         
@@ -246,8 +445,8 @@ class MadLibsCreator:
         result_frame = ttk.LabelFrame(self.ai_tab, text="Generated Template")
         result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.result_text = tk.Text(result_frame, wrap=tk.WORD, state=tk.DISABLED)
-        self.result_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.ai_result_text = tk.Text(result_frame, wrap=tk.WORD, state=tk.DISABLED)
+        self.ai_result_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Buttons frame
         buttons_frame = ttk.Frame(self.ai_tab)
@@ -257,36 +456,51 @@ class MadLibsCreator:
                                           command=self.use_generated_template, state=tk.DISABLED)
         self.use_template_btn.pack(side=tk.RIGHT, padx=5, pady=5)
     
+    @metrics.timed("gui.extract_placeholders")
     def extract_placeholders(self):
         template = self.template_text.get("1.0", tk.END).strip()
         if not template:
             messagebox.showwarning("Warning", "Please enter a template first.")
             return
         
-        # Find all placeholders in [brackets]
-        placeholders = re.findall(r'\[(.*?)\]', template)
-        
-        # Remove duplicates but preserve order
-        unique_placeholders = []
-        for p in placeholders:
-            if p not in unique_placeholders:
-                unique_placeholders.append(p)
-        
-        # Update the current madlib
         self.current_madlib["template"] = template
-        self.current_madlib["placeholders"] = unique_placeholders
-        
-        # Update the placeholders list
-        self.placeholders_list.delete(0, tk.END)
-        for p in unique_placeholders:
-            self.placeholders_list.insert(tk.END, p)
+        unique_placeholders = self.update_placeholders()
         
         messagebox.showinfo("Success", f"Found {len(unique_placeholders)} unique placeholders.")
     
+    def on_template_modified(self, event=None):
+        # Clearing the modified flag fires the event again; ignore that one
+        if not self.template_text.edit_modified():
+            return
+        self.template_text.edit_modified(False)
+        if self.placeholders_job:
+            self.root.after_cancel(self.placeholders_job)
+        self.placeholders_job = self.root.after(PLACEHOLDER_DEBOUNCE_MS, self.update_placeholders)
+    
+    @metrics.timed("gui.update_placeholders")
+    def update_placeholders(self):
+        """Rescan the edited lines of the template and update the placeholders list"""
+        if self.placeholders_job:
+            self.root.after_cancel(self.placeholders_job)
+            self.placeholders_job = None
+        
+        index = self.placeholder_index
+        index.update(self.template_text.get("1.0", "end-1c"))
+        unique_placeholders = index.placeholders()
+        self.current_madlib["placeholders"] = unique_placeholders
+        sync_listbox(self.placeholders_list, unique_placeholders)
+        self.placeholders_frame.config(
+            text=f"Placeholders ({len(unique_placeholders)} unique, {index.total()} in the template)")
+        return unique_placeholders
+    
     def save_current_madlib(self):
         title = self.title_entry.get().strip()
         template = self.template_text.get("1.0", tk.END).strip()
         
+        # Don't wait for the live extraction to catch up with the last edit
+        if self.placeholders_job:
+            self.update_placeholders()
+        
         if not title:
             messagebox.showwarning("Warning", "Please enter a title.")
             return
@@ -303,73 +517,145 @@ class MadLibsCreator:
         self.current_madlib["title"] = title
         self.current_madlib["template"] = template
         
-        # Check if we're editing an existing madlib
-        existing_index = -1
-        for i, madlib in enumerate(self.saved_madlibs):
-            if madlib["title"] == title:
-                existing_index = i
-                break
-        
-        if existing_index >= 0:
-            # Update existing
-            self.saved_madlibs[existing_index] = self.current_madlib.copy()
-            messagebox.showinfo("Success", f"Updated Mad Lib: {title}")
+        # Add new or update the existing madlib with this title
+        if self.put_madlib(self.current_madlib.copy()):
+            self.madlib_added()
+            self.set_status(f"Saved new Mad Lib: {title}")
         else:
-            # Add new
-            self.saved_madlibs.append(self.current_madlib.copy())
-            messagebox.showinfo("Success", f"Saved new Mad Lib: {title}")
-        
-        # Update UI
-        self.update_madlibs_ui()
+            self.set_status(f"Updated Mad Lib: {title}")
         
-        # Auto-save
-        self.save_madlibs()
+        # Changes are autosaved in the background; ask where to save if no file is open yet
+        if not self.store and not self.copy_job:
+            self.save_as_madlibs()
     
+    def put_madlib(self, record):
+        """Add or update a madlib, autosaving the change if a file is open"""
+        if self.copy_changes is not None:
+            self.copy_changes.append((record, None))
+        if not self.store:
+            return self.saved_madlibs.put(record)
+        is_new = self.store.put(record)
+        self.autosaver.mark_dirty()
+        return is_new
+    
+    def remove_madlib(self, title):
+        """Remove a madlib, autosaving the change if a file is open"""
+        if self.copy_changes is not None:
+            self.copy_changes.append((None, title))
+        if not self.store:
+            return self.saved_madlibs.remove(title)
+        record = self.store.remove(title)
+        self.autosaver.mark_dirty()
+        return record
+    
+    def stop_loading(self):
+        """Stop filling the library from a file that is still loading"""
+        if self.loader:
+            self.loader.close()
+            self.loader = None
+    
+    def set_store(self, store):
+        """Switch to a new store, saving what is left of the old one"""
+        self.stop_loading()
+        if self.autosaver:
+            self.autosaver.close()
+        if self.store:
+            self.store.close()
+        self.store = store
+        self.saved_madlibs = store.library
+        self.current_file = store.path
+        self.autosaver = Autosaver(store, on_status=self.status_messages.put)
+    
+    def close_store(self):
+        """Forget the current file and start over with an empty library"""
+        self.stop_loading()
+        if self.autosaver:
+            self.autosaver.close()
+        if self.store:
+            self.store.close()
+        self.store = self.autosaver = self.current_file = None
+        self.saved_madlibs = MadLibsLibrary(searchable=True)
+    
+    def index_library(self):
+        """Build the search index of an in-memory library off the Tk thread"""
+        if isinstance(self.saved_madlibs, MadLibsLibrary):
+            self.saved_madlibs.build_search_index(background=True)
+    
+    def set_status(self, message):
+        self.status_var.set(message)
+    
+    def poll_status_messages(self):
+        """Show status messages posted by the autosave thread"""
+        try:
+            while True:
+                self.set_status(self.status_messages.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_status_messages)
+    
+    def quit_app(self):
+        # Let the autosave thread write any outstanding changes first
+        if self.autosaver:
+            self.autosaver.close()
+        if self.store:
+            self.store.close()
+        # Don't wait for AI requests that are still running
+        if self.ai_cancel_event:
+            self.ai_cancel_event.set()
+        self.ai_executor.shutdown(wait=False)
+        self.copy_executor.shutdown(wait=False)
+        self.ai_client.close()
+        self.root.destroy()
+    
+    @metrics.timed("gui.update_madlibs_ui")
     def update_madlibs_ui(self):
-        # Update the listbox in manage tab
-        self.madlibs_listbox.delete(0, tk.END)
-        for madlib in self.saved_madlibs:
-            self.madlibs_listbox.insert(tk.END, madlib["title"])
-        
-        # Update the combobox in play tab
-        titles = [madlib["title"] for madlib in self.saved_madlibs]
-        self.madlib_selector["values"] = titles
-        if titles:
+        """Show a newly loaded library in the manage and play tabs"""
+        titles = TitleView(self.saved_madlibs)
+        for view in self.title_views():
+            view.set_items(titles)
+        self.refresh_search()
+        self.select_first_madlib()
+    
+    def refresh_madlibs_ui(self):
+        """Redraw the visible rows after the library grew"""
+        for view in self.title_views():
+            view.refresh()
+        self.select_first_madlib()
+    
+    def madlib_added(self):
+        # New madlibs are always appended to the library
+        index = len(self.saved_madlibs) - 1
+        for view in self.title_views():
+            view.item_inserted(index)
+        self.refresh_search()
+        self.select_first_madlib()
+    
+    def madlib_removed(self, index):
+        for view in self.title_views():
+            view.item_removed(index)
+        self.refresh_search()
+        self.select_first_madlib()
+    
+    def select_first_madlib(self):
+        if self.madlib_selector and self.madlib_selector.current() < 0 and len(self.madlib_selector.items):
             self.madlib_selector.current(0)
+            self.load_selected_madlib()
     
+    @metrics.timed("gui.load_selected_madlib")
     def load_selected_madlib(self, event=None):
         selected_title = self.madlib_selector.get()
         if not selected_title:
             return
         
         # Find the selected madlib
-        selected_madlib = None
-        for madlib in self.saved_madlibs:
-            if madlib["title"] == selected_title:
-                selected_madlib = madlib
-                break
-        
+        selected_madlib = self.saved_madlibs.get(selected_title)
         if not selected_madlib:
             return
         
-        # Clear previous inputs
-        for widget in self.inputs_frame.winfo_children():
-            widget.destroy()
-        
-        # Create input fields for each placeholder
-        self.placeholder_entries = {}
-        for i, placeholder in enumerate(selected_madlib["placeholders"]):
-            frame = ttk.Frame(self.inputs_frame)
-            frame.pack(fill=tk.X, padx=5, pady=2)
-            
-            label = ttk.Label(frame, text=f"{placeholder}:", width=20)
-            label.pack(side=tk.LEFT, padx=5, pady=2)
-            
-            entry = ttk.Entry(frame)
-            entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
-            
-            self.placeholder_entries[placeholder] = entry
+        # One input per unique placeholder; a placeholder used twice gets the same word
+        self.input_form.set_fields(dict.fromkeys(selected_madlib["placeholders"]))
     
+    @metrics.timed("gui.generate_story")
     def generate_story(self):
         selected_title = self.madlib_selector.get()
         if not selected_title:
@@ -377,28 +663,22 @@ class MadLibsCreator:
             return
         
         # Find the selected madlib
-        selected_madlib = None
-        for madlib in self.saved_madlibs:
-            if madlib["title"] == selected_title:
-                selected_madlib = madlib
-                break
-        
+        selected_madlib = self.saved_madlibs.get(selected_title)
         if not selected_madlib:
             return
         
         # Get user inputs
         inputs = {}
-        for placeholder, entry in self.placeholder_entries.items():
-            value = entry.get().strip()
+        for i, (placeholder, value) in enumerate(self.input_form.get_values().items()):
+            value = value.strip()
             if not value:
                 messagebox.showwarning("Warning", f"Please fill in the {placeholder} field.")
+                self.input_form.focus_field(i)
                 return
             inputs[placeholder] = value
         
         # Generate the story
-        story = selected_madlib["template"]
-        for placeholder, value in inputs.items():
-            story = story.replace(f"[{placeholder}]", value)
+        story = render_template(selected_madlib["template"], inputs)
         
         # Display the result
         self.result_text.config(state=tk.NORMAL)
@@ -412,7 +692,7 @@ class MadLibsCreator:
             messagebox.showwarning("Warning", "Please select a Mad Lib to edit.")
             return
         
-        selected_madlib = self.saved_madlibs[selected_index[0]]
+        selected_madlib = self.saved_madlibs.get(self.madlibs_listbox.items[selected_index[0]])
         
         # Load the selected madlib into the create tab
         self.current_madlib = selected_madlib.copy()
@@ -435,7 +715,8 @@ class MadLibsCreator:
             messagebox.showwarning("Warning", "Please select a Mad Lib to delete.")
             return
         
-        selected_title = self.saved_madlibs[selected_index[0]]["title"]
+        # The list may be showing search results, so go by title
+        selected_title = self.madlibs_listbox.items[selected_index[0]]
         
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Deletion", 
@@ -444,15 +725,16 @@ class MadLibsCreator:
             return
         
         # Delete the madlib
-        del self.saved_madlibs[selected_index[0]]
+        index = self.saved_madlibs.index(selected_title)
+        self.remove_madlib(selected_title)
         
         # Update UI
-        self.update_madlibs_ui()
+        self.madlib_removed(index)
         
-        # Auto-save
-        self.save_madlibs()
+        if not self.store:
+            self.save_as_madlibs()
         
-        messagebox.showinfo("Success", f"Deleted Mad Lib: {selected_title}")
+        self.set_status(f"Deleted Mad Lib: {selected_title}")
     
     def new_madlib(self):
         # Clear current madlib
@@ -470,64 +752,152 @@ class MadLibsCreator:
         self.notebook.select(0)
     
     def open_madlibs(self):
+        if self.copy_job:
+            messagebox.showinfo("Still Saving",
+                                "Please wait until the library has been saved, then Open again.")
+            return
+        
         filepath = filedialog.askopenfilename(
             defaultextension=".json",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            filetypes=LIBRARY_FILETYPES
         )
         
         if not filepath:
             return
         
+        def load_failed(e):
+            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+        
         try:
-            with open(filepath, "r") as file:
-                self.saved_madlibs = json.load(file)
-            
-            self.current_file = filepath
-            self.update_madlibs_ui()
-            messagebox.showinfo("Success", f"Loaded Mad Libs from {filepath}")
+            store = open_store(filepath, searchable=True)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+            load_failed(e)
+            return
+        self.load_store(store, on_error=load_failed)
     
+    @metrics.timed("gui.save_madlibs")
     def save_madlibs(self):
-        if not self.current_file:
+        if not self.store:
             self.save_as_madlibs()
             return
         
-        try:
-            with open(self.current_file, "w") as file:
-                json.dump(self.saved_madlibs, file, indent=2)
-            messagebox.showinfo("Success", f"Saved Mad Libs to {self.current_file}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+        # Write a full snapshot (folding in the journal) on the autosave thread
+        self.autosaver.request_save()
+        self.set_status(f"Saving Mad Libs to {self.current_file}...")
     
     def save_as_madlibs(self):
+        if self.loader:
+            # Saving now would write out only part of the library
+            messagebox.showinfo("Still Loading",
+                                "Please wait until the library has finished loading, then Save As again.")
+            return
+        if self.copy_job:
+            messagebox.showinfo("Still Saving",
+                                "Please wait until the library has been saved, then Save As again.")
+            return
+        
         filepath = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            filetypes=LIBRARY_FILETYPES
         )
         
         if not filepath:
             return
         
-        self.current_file = filepath
+        source = self.saved_madlibs
+        if not needs_copy(filepath, source):
+            # The new file takes the in-memory library over as it is
+            self.set_store(open_store(filepath, source, searchable=True))
+            self.save_madlibs()
+            return
+        
+        # Copying to another backend reads every record; do it off the Tk thread
+        if isinstance(source, MadLibsLibrary):
+            # The library itself keeps changing on this thread
+            source = source.to_list()
+        total = len(source)
+        
+        def progress(count):
+            self.status_messages.put(f"Saving Mad Libs to {filepath}... {count} of {total}")
+        
+        self.copy_changes = []
+        self.copy_job = self.copy_executor.submit(open_store, filepath, source, searchable=True,
+                                                  progress=progress)
+        self.set_status(f"Saving Mad Libs to {filepath}...")
+        self.root.after(50, self.check_copy)
+    
+    def check_copy(self):
+        """Switch to the Save As copy once it is done"""
+        if not self.copy_job.done():
+            self.root.after(50, self.check_copy)
+            return
+        job, self.copy_job = self.copy_job, None
+        changes, self.copy_changes = self.copy_changes, None
+        try:
+            store = job.result()
+        except Exception as e:
+            self.set_status("Save As failed")
+            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+            return
+        
+        self.set_store(store)
+        # Edits made while the copy was being made
+        for record, title in changes:
+            if record is not None:
+                store.put(record)
+            else:
+                store.remove(title)
+        self.index_library()
+        self.update_madlibs_ui()
         self.save_madlibs()
     
+    @metrics.timed("gui.load_madlibs")
     def load_madlibs(self):
         # Try to load from default location
         default_path = os.path.join(os.path.expanduser("~"), "madlibs.json")
         
-        if os.path.exists(default_path):
+        store = open_store(default_path, searchable=True)
+        if store.exists():
+            # If loading fails, we are left with an empty library
+            self.load_store(store)
+        else:
+            self.saved_madlibs = MadLibsLibrary(searchable=True)
+    
+    def load_store(self, store, on_error=None):
+        """Load a store in small batches so the window stays responsive"""
+        loader = store.iter_load()
+        # Stops loading the previous file, if it was still loading
+        self.set_store(store)
+        self.loader = loader
+        self.update_madlibs_ui()
+        
+        def load_step():
+            if self.loader is not loader:
+                # A different file was opened in the meantime
+                return
+            
+            # Add batches for one frame's worth of time, then let Tk redraw
+            deadline = time.perf_counter() + 0.015
             try:
-                with open(default_path, "r") as file:
-                    self.saved_madlibs = json.load(file)
-                
-                self.current_file = default_path
+                while time.perf_counter() < deadline:
+                    next(loader)
+            except StopIteration:
+                self.loader = None
+                self.index_library()
                 self.update_madlibs_ui()
-            except:
-                # If loading fails, start with empty list
-                self.saved_madlibs = []
-        else:
-            self.saved_madlibs = []
+                self.set_status(f"Loaded {len(self.saved_madlibs)} Mad Libs from {store.path}")
+            except Exception as e:
+                self.close_store()
+                self.update_madlibs_ui()
+                self.set_status(f"Failed to load {store.path}")
+                if on_error:
+                    on_error(e)
+            else:
+                self.refresh_madlibs_ui()
+                self.set_status(f"Loading Mad Libs... {len(self.saved_madlibs)} so far")
+                self.root.after(1, load_step)
+        
+        self.root.after(1, load_step)
     
     def show_about(self):
         messagebox.showinfo("About", "Mad Libs Creator\nVersion 1.0\n\nCreate and play your own Mad Libs games!")
@@ -549,21 +919,26 @@ class MadLibsCreator:
         
         Manage Tab:
         1. View all your saved Mad Libs
-        2. Select one to edit or delete
+        2. Type in the search box to find Mad Libs by title or text;
+           [noun] only finds Mad Libs with that placeholder
+           (the Play tab has the same search for its selector)
+        3. Select one to edit or delete
+        
+        Save your library as a .db file to keep it in a SQLite
+        database, which stays fast for very large libraries.
         """
         messagebox.showinfo("Help", help_text)
 
     def load_template(self):
         # Check if templates directory exists
-        templates_dir = "templates"
-        if not os.path.exists(templates_dir):
+        if not self.template_catalog.exists():
             messagebox.showwarning("Warning", "Templates directory not found.")
             return
         
-        # Get list of template files
-        template_files = [f for f in os.listdir(templates_dir) if f.endswith('.json')]
+        # Get list of template files (cached, only re-read when they change)
+        template_entries = self.template_catalog.entries()
         
-        if not template_files:
+        if not template_entries:
             messagebox.showwarning("Warning", "No template files found in templates directory.")
             return
         
@@ -581,9 +956,7 @@ class MadLibsCreator:
         template_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Add template names to listbox (without .json extension)
-        for template_file in template_files:
-            template_name = os.path.splitext(template_file)[0].replace('_', ' ').title()
-            template_listbox.insert(tk.END, template_name)
+        template_listbox.insert(tk.END, *[entry.name for entry in template_entries])
         
         def select_template():
             selection = template_listbox.curselection()
@@ -591,33 +964,31 @@ class MadLibsCreator:
                 messagebox.showwarning("Warning", "Please select a template.")
                 return
             
-            selected_file = template_files[selection[0]]
-            template_path = os.path.join(templates_dir, selected_file)
+            selected_file = template_entries[selection[0]].filename
             
             try:
-                with open(template_path, 'r') as file:
-                    template_data = json.load(file)
-                    
-                    # Load the template into the current madlib
-                    self.current_madlib = template_data.copy()
-                    
-                    # Update UI
-                    self.title_entry.delete(0, tk.END)
-                    self.title_entry.insert(0, template_data["title"])
-                    
-                    self.template_text.delete("1.0", tk.END)
-                    self.template_text.insert("1.0", template_data["template"])
-                    
-                    self.placeholders_list.delete(0, tk.END)
-                    for p in template_data["placeholders"]:
-                        self.placeholders_list.insert(tk.END, p)
-                    
-                    # Switch to create tab
-                    self.notebook.select(0)
-                    
-                    messagebox.showinfo("Success", f"Loaded template: {template_data['title']}")
-                    template_dialog.destroy()
-                    
+                template_data = self.template_catalog.load(selected_file)
+                
+                # Load the template into the current madlib
+                self.current_madlib = template_data
+                
+                # Update UI
+                self.title_entry.delete(0, tk.END)
+                self.title_entry.insert(0, template_data["title"])
+                
+                self.template_text.delete("1.0", tk.END)
+                self.template_text.insert("1.0", template_data["template"])
+                
+                self.placeholders_list.delete(0, tk.END)
+                for p in template_data["placeholders"]:
+                    self.placeholders_list.insert(tk.END, p)
+                
+                # Switch to create tab
+                self.notebook.select(0)
+                
+                messagebox.showinfo("Success", f"Loaded template: {template_data['title']}")
+                template_dialog.destroy()
+                
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load template: {str(e)}")
         
@@ -630,8 +1001,7 @@ class MadLibsCreator:
 
     def load_example_templates(self):
         # Check if templates directory exists
-        templates_dir = "templates"
-        if not os.path.exists(templates_dir):
+        if not self.template_catalog.exists():
             # Try to create templates on the fly
             try:
                 self.create_example_templates()
@@ -639,10 +1009,10 @@ class MadLibsCreator:
                 messagebox.showerror("Error", f"Could not create example templates: {str(e)}")
                 return
         
-        # Get list of template files
-        template_files = [f for f in os.listdir(templates_dir) if f.endswith('.json')]
+        # Get list of template files (cached, only re-read when they change)
+        template_entries = self.template_catalog.entries()
         
-        if not template_files:
+        if not template_entries:
             messagebox.showwarning("Warning", "No template files found in templates directory.")
             return
         
@@ -660,9 +1030,7 @@ class MadLibsCreator:
         template_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Add template names to listbox (without .json extension)
-        for template_file in template_files:
-            template_name = os.path.splitext(template_file)[0].replace('_', ' ').title()
-            template_listbox.insert(tk.END, template_name)
+        template_listbox.insert(tk.END, *[entry.name for entry in template_entries])
         
         # Add a description label
         description_label = ttk.Label(template_dialog, text="", wraplength=380)
@@ -674,19 +1042,12 @@ class MadLibsCreator:
             if not selection:
                 return
             
-            selected_file = template_files[selection[0]]
-            template_path = os.path.join(templates_dir, selected_file)
-            
-            try:
-                with open(template_path, 'r') as file:
-                    template_data = json.load(file)
-                    # Show a preview of the template
-                    preview = template_data["template"]
-                    if len(preview) > 150:
-                        preview = preview[:150] + "..."
-                    description_label.config(text=f"Preview: {preview}")
-            except Exception:
+            # Show a preview of the template from the catalog, no disk access needed
+            preview = template_entries[selection[0]].preview
+            if preview is None:
                 description_label.config(text="Could not load template preview.")
+            else:
+                description_label.config(text=f"Preview: {preview}")
         
         template_listbox.bind("<<ListboxSelect>>", show_description)
         
@@ -696,27 +1057,19 @@ class MadLibsCreator:
                 messagebox.showwarning("Warning", "Please select a template.")
                 return
             
-            selected_file = template_files[selection[0]]
-            template_path = os.path.join(templates_dir, selected_file)
+            selected_file = template_entries[selection[0]].filename
             
             try:
-                with open(template_path, 'r') as file:
-                    template_data = json.load(file)
-                    
-                # Add this template to saved madlibs if not already there
-                template_exists = False
-                for madlib in self.saved_madlibs:
-                    if madlib["title"] == template_data["title"]:
-                        template_exists = True
-                        break
+                template_data = self.template_catalog.load(selected_file)
                 
-                if not template_exists:
-                    self.saved_madlibs.append(template_data.copy())
-                    self.update_madlibs_ui()
+                # Add this template to saved madlibs if not already there
+                if template_data["title"] not in self.saved_madlibs:
+                    self.put_madlib(template_data)
+                    self.madlib_added()
                 
                 # Select this template in the play tab
-                index = self.madlib_selector["values"].index(template_data["title"]) if template_data["title"] in self.madlib_selector["values"] else 0
-                self.madlib_selector.current(index)
+                self.clear_search(self.madlib_selector)
+                self.madlib_selector.current(self.saved_madlibs.index(template_data["title"]))
                 self.load_selected_madlib()
                 
                 template_dialog.destroy()
@@ -733,149 +1086,14 @@ class MadLibsCreator:
 
     def create_example_templates(self):
         """Create example templates if they don't exist"""
-        templates_dir = "templates"
-        if not os.path.exists(templates_dir):
-            os.makedirs(templates_dir)
-        
-        # Define the example templates
-        templates = [
-            # Original 5 templates
-            {
-                "filename": "space_adventure.json",
-                "data": {
-                    "title": "Space Adventure",
-                    "template": "Captain [name] embarked on a journey to the [adjective] planet [planet_name]. The ship's [noun] malfunctioned as they [verb_past] through an asteroid field. \"[exclamation]!\" shouted the captain, \"We need to [verb] immediately!\" The alien crew members began to [verb] frantically. Eventually, they landed on a [adjective] moon where [plural_noun] roamed freely. It was the most [adjective] adventure in the history of space exploration.",
-                    "placeholders": ["name", "adjective", "planet_name", "noun", "verb_past", "exclamation", "verb", "verb", "adjective", "plural_noun", "adjective"]
-                }
-            },
-            {
-                "filename": "fairy_tale.json",
-                "data": {
-                    "title": "Once Upon a Time",
-                    "template": "Once upon a time, in a [adjective] kingdom, there lived a [noun] named [name]. Every day, they would [verb] by the [adjective] [place]. One day, a [adjective] [magical_creature] appeared and granted them three [plural_noun]. \"[exclamation]!\" they shouted with joy. With their new [plural_noun], [name] decided to [verb] the evil [villain]. After a [adjective] battle, they lived [adverb] ever after.",
-                    "placeholders": ["adjective", "noun", "name", "verb", "adjective", "place", "adjective", "magical_creature", "plural_noun", "exclamation", "plural_noun", "name", "verb", "villain", "adjective", "adverb"]
-                }
-            },
-            {
-                "filename": "cooking_disaster.json",
-                "data": {
-                    "title": "Kitchen Catastrophe",
-                    "template": "Today I decided to cook a [adjective] meal for my [relative]. I started by [verb_ending_in_ing] [number] [plural_food] in a [adjective] pan. I accidentally added too much [substance], which made everything smell like [smelly_item]. \"[exclamation]!\" I shouted as the mixture began to [verb]. I tried to fix it by adding a [adjective] [food_item], but that only made it [verb]. In the end, we just ordered [type_of_cuisine] food and [verb_past] while watching [TV_show].",
-                    "placeholders": ["adjective", "relative", "verb_ending_in_ing", "number", "plural_food", "adjective", "substance", "smelly_item", "exclamation", "verb", "adjective", "food_item", "verb", "type_of_cuisine", "verb_past", "TV_show"]
-                }
-            },
-            {
-                "filename": "superhero_origin.json",
-                "data": {
-                    "title": "Birth of a Hero",
-                    "template": "By day, [name] was just an ordinary [occupation], but at night, they became [superhero_name], the most [adjective] superhero in [city_name]! Their superpowers included [verb_ending_in_ing] [adverb] and shooting [plural_noun] from their [body_part]. Their arch-nemesis, [villain_name], was always plotting to [verb] the city's supply of [plural_noun]. With the help of their sidekick, [animal], [superhero_name] always saved the day by using their [adjective] [noun] to [verb] the day!",
-                    "placeholders": ["name", "occupation", "superhero_name", "adjective", "city_name", "verb_ending_in_ing", "adverb", "plural_noun", "body_part", "villain_name", "verb", "plural_noun", "animal", "superhero_name", "adjective", "noun", "verb"]
-                }
-            },
-            {
-                "filename": "vacation_disaster.json",
-                "data": {
-                    "title": "Vacation Disaster",
-                    "template": "Last summer, my family decided to go on a [adjective] vacation to [place]. We packed our [plural_noun] and headed off in our [adjective] [vehicle]. After [number] hours of traveling, we realized we had forgotten our [important_item]! \"[exclamation]!\" my [family_member] screamed. We stopped at a [adjective] store to buy a new one, but they only had [adjective] ones. The hotel was even worse! The room was full of [plural_noun] and the [room_item] was [verb_ending_in_ing]. We ended up [verb_ending_in_ing] at a nearby [place] instead, which turned out to be the most [adjective] part of our trip.",
-                    "placeholders": ["adjective", "place", "plural_noun", "adjective", "vehicle", "number", "important_item", "exclamation", "family_member", "adjective", "adjective", "plural_noun", "room_item", "verb_ending_in_ing", "verb_ending_in_ing", "place", "adjective"]
-                }
-            },
-            
-            # 10 new templates
-            {
-                "filename": "haunted_house.json",
-                "data": {
-                    "title": "The Haunted House",
-                    "template": "Last night, I decided to explore the [adjective] haunted house on [street_name] Street. I brought my trusty [noun] for protection. As I approached the [adjective] door, I heard a [sound] coming from inside. \"[exclamation]!\" I whispered. I slowly turned the [adjective] doorknob and entered. The floor was covered in [plural_noun] and the walls were dripping with [substance]. Suddenly, a [adjective] [monster] jumped out and started [verb_ending_in_ing] around the room. I tried to [verb], but my legs wouldn't move. The ghost whispered, \"[silly_phrase]\" and then disappeared in a puff of [color] smoke. I'll never go [verb_ending_in_ing] in a haunted house again!",
-                    "placeholders": ["adjective", "street_name", "noun", "adjective", "sound", "exclamation", "adjective", "plural_noun", "substance", "adjective", "monster", "verb_ending_in_ing", "verb", "silly_phrase", "color", "verb_ending_in_ing"]
-                }
-            },
-            {
-                "filename": "job_interview.json",
-                "data": {
-                    "title": "My Disastrous Job Interview",
-                    "template": "I was so [adjective] about my job interview at [company_name]. I put on my most [adjective] [clothing_item] and practiced answering questions in front of my [noun]. When I arrived, the receptionist asked me to [verb] in the waiting room. After [number] minutes, a [adjective] person named [name] called me into their office. The interview started well until they asked me why I wanted to [verb] for their company. I accidentally said, \"Because I'm really good at [verb_ending_in_ing] [plural_noun]!\" The interviewer looked [adjective] and then asked about my greatest weakness. I blurted out, \"[food]!\" Before I knew it, I was [verb_ending_in_ing] out the door. I guess I won't be [verb_ending_in_ing] there anytime soon!",
-                    "placeholders": ["adjective", "company_name", "adjective", "clothing_item", "noun", "verb", "number", "adjective", "name", "verb", "verb_ending_in_ing", "plural_noun", "adjective", "food", "verb_ending_in_ing", "verb_ending_in_ing"]
-                }
-            },
-            {
-                "filename": "alien_encounter.json",
-                "data": {
-                    "title": "Close Encounter",
-                    "template": "I was [verb_ending_in_ing] in my backyard when a [adjective] light appeared in the sky. A [color] spacecraft landed on my [noun]. The door opened with a [sound], and [number] aliens with [body_part_plural] on their heads stepped out. \"[greeting]!\" their leader said in a [adjective] voice. \"We come from the planet [made_up_word] and need your [plural_noun] to save our civilization!\" I was so [emotion] that I could only [verb]. They offered me a [adjective] [food] as a gift. Before leaving, they [adverb] promised to return next [day_of_week]. Now I keep a [noun] ready just in case they come back for more [plural_noun].",
-                    "placeholders": ["verb_ending_in_ing", "adjective", "color", "noun", "sound", "number", "body_part_plural", "greeting", "adjective", "made_up_word", "plural_noun", "emotion", "verb", "adjective", "food", "adverb", "day_of_week", "noun", "plural_noun"]
-                }
-            },
-            {
-                "filename": "first_date.json",
-                "data": {
-                    "title": "First Date Fiasco",
-                    "template": "I was so [adjective] about my first date with [name]. I decided to wear my favorite [color] [clothing_item] and meet them at a [adjective] restaurant called [restaurant_name]. When I arrived, I accidentally tripped over a [noun] and [verb_past] right into the [noun]. [name] was already sitting at our table, looking [adjective] in their [clothing_item]. I tried to act [adverb], but when I went to [verb] my chair, I [verb_past] instead. The waiter came over and I nervously ordered [food] with extra [food_ingredient]. During our conversation, I mentioned my love for [verb_ending_in_ing] [plural_noun], which made [name] look at me [adverb]. By the end of the night, I had [verb_past] my [body_part] and spilled [beverage] all over the table. Surprisingly, [name] still wants to [verb] again next [day_of_week]!",
-                    "placeholders": ["adjective", "name", "color", "clothing_item", "adjective", "restaurant_name", "noun", "verb_past", "noun", "name", "adjective", "clothing_item", "adverb", "verb", "verb_past", "food", "food_ingredient", "verb_ending_in_ing", "plural_noun", "name", "adverb", "verb_past", "body_part", "beverage", "name", "verb", "day_of_week"]
-                }
-            },
-            {
-                "filename": "sports_commentary.json",
-                "data": {
-                    "title": "Sports Commentary",
-                    "template": "Welcome to the championship [sport] game between the [city] [plural_animal] and the [city] [plural_noun]! The [plural_animal]'s star player, [name], is known for their ability to [verb] [adverb]. The crowd is [verb_ending_in_ing] as the game begins! Oh my! [name] just [verb_past] the [noun] across the entire [place]! The coach is [verb_ending_in_ing] on the sidelines. Wait - a [adjective] [animal] has run onto the field! Security is trying to [verb] it, but it's too [adjective]! Meanwhile, the [plural_noun] are attempting their famous \"[silly_phrase]\" play. The referee throws a [color] flag and calls a penalty for illegal [verb_ending_in_ing]. With only [number] seconds left, [name] makes the winning move by [verb_ending_in_ing] over three defenders! The [plural_animal] win the [adjective] trophy, and the celebration is absolutely [adjective]!",
-                    "placeholders": ["sport", "city", "plural_animal", "city", "plural_noun", "plural_animal", "name", "verb", "adverb", "verb_ending_in_ing", "name", "verb_past", "noun", "place", "verb_ending_in_ing", "adjective", "animal", "verb", "adjective", "plural_noun", "silly_phrase", "color", "verb_ending_in_ing", "number", "name", "verb_ending_in_ing", "plural_animal", "adjective", "adjective"]
-                }
-            },
-            {
-                "filename": "weather_report.json",
-                "data": {
-                    "title": "Unusual Weather Report",
-                    "template": "Good evening, I'm [name] with your [adjective] weather forecast. Today, we experienced [adjective] temperatures reaching [number] degrees, causing [plural_noun] to [verb] spontaneously! Tomorrow, a front of [adjective] air will move in from the [direction], bringing a 70% chance of falling [plural_noun]. Residents in [city_name] should prepare by [verb_ending_in_ing] their [plural_noun] and keeping a [noun] handy. The [body_of_water] is expected to turn [color] and begin [verb_ending_in_ing] due to the unusual atmospheric [noun]. Weather experts are [verb_ending_in_ing] in confusion. By [day_of_week], we expect [animal_plural] to rain from the sky, so don't forget your [adjective] umbrella! This has been [name] with your [adjective] weather report. Back to you in the studio!",
-                    "placeholders": ["name", "adjective", "adjective", "number", "plural_noun", "verb", "adjective", "direction", "plural_noun", "city_name", "verb_ending_in_ing", "plural_noun", "noun", "body_of_water", "color", "verb_ending_in_ing", "noun", "verb_ending_in_ing", "day_of_week", "animal_plural", "adjective", "name", "adjective"]
-                }
-            },
-            {
-                "filename": "video_game.json",
-                "data": {
-                    "title": "Epic Video Game Adventure",
-                    "template": "In the [adjective] video game \"[made_up_title]\", you play as a heroic [occupation] named [character_name] who must save the kingdom of [made_up_place]. Your character can [verb] up to [number] feet and has a special ability to [verb] [plural_noun] with their magical [noun]. The main villain, the evil [title] [villain_name], has stolen all the [plural_noun] and hidden them in a [adjective] castle guarded by [number] [adjective] [creature_plural]. Along your journey, you'll meet a [adjective] sidekick who helps you by [verb_ending_in_ing] [adverb]. The most challenging level is the [place] of [emotion], where you must [verb] across [substance] while avoiding flying [plural_noun]. If you collect enough [color] coins, you can unlock the secret [clothing_item] that makes you [verb] twice as fast! The final boss battle involves [verb_ending_in_ing] the villain until they [verb] and turn into a giant [animal].",
-                    "placeholders": ["adjective", "made_up_title", "occupation", "character_name", "made_up_place", "verb", "number", "verb", "plural_noun", "noun", "title", "villain_name", "plural_noun", "adjective", "number", "adjective", "creature_plural", "adjective", "verb_ending_in_ing", "adverb", "place", "emotion", "verb", "substance", "plural_noun", "color", "clothing_item", "verb", "verb_ending_in_ing", "verb", "animal"]
-                }
-            },
-            {
-                "filename": "restaurant_review.json",
-                "data": {
-                    "title": "Restaurant Critic",
-                    "template": "I recently visited the new [nationality] restaurant called \"[restaurant_name]\" on [street_name] Street. The atmosphere was [adjective] with [plural_noun] hanging from the ceiling and [adjective] music playing in the background. My server, who introduced themselves as [name], was extremely [adjective] and recommended their signature dish: [food] with [adjective] [food_ingredient] sauce. When the appetizer arrived, it looked like a [noun] that had been [verb_past] for [number] hours. I cautiously took a [adjective] bite and my taste buds began [verb_ending_in_ing] immediately! For the main course, I ordered the [animal] [body_part] served on a bed of [color] [plural_vegetable]. The chef clearly enjoys [verb_ending_in_ing] too much [substance] into everything. The dessert, however, was [adverb] [adjective] – a [adjective] [dessert] topped with [plural_noun]. I give this restaurant [number] out of 5 stars, and would recommend it to anyone who enjoys [verb_ending_in_ing] while they eat.",
-                    "placeholders": ["nationality", "restaurant_name", "street_name", "adjective", "plural_noun", "adjective", "name", "adjective", "food", "adjective", "food_ingredient", "noun", "verb_past", "number", "adjective", "verb_ending_in_ing", "animal", "body_part", "color", "plural_vegetable", "verb_ending_in_ing", "substance", "adverb", "adjective", "adjective", "dessert", "plural_noun", "number", "verb_ending_in_ing"]
-                }
-            },
-            {
-                "filename": "love_letter.json",
-                "data": {
-                    "title": "Ridiculous Love Letter",
-                    "template": "My [adjective] [term_of_endearment],\n\nEver since I [verb_past] you at the [place], I haven't been able to stop [verb_ending_in_ing] about you. Your [body_part_plural] are like [plural_noun], and your [adjective] smile makes my [body_part] [verb] with joy. You are more [adjective] than a [noun] full of [plural_noun].\n\nWhen you [verb], it sounds like a [animal] [verb_ending_in_ing] in a field of [plural_flower]. I want to [verb] with you under the [celestial_body] and whisper [adjective] nothings into your [body_part].\n\nYesterday, I wrote a [adjective] poem about your [body_part], but my [animal] ate it. I've enclosed a [adjective] [noun] to show my affection. Please [verb] me soon, as I'm [adverb] [verb_ending_in_ing] for your reply.\n\n[adverb] yours,\n[silly_name]",
-                    "placeholders": ["adjective", "term_of_endearment", "verb_past", "place", "verb_ending_in_ing", "body_part_plural", "plural_noun", "adjective", "body_part", "verb", "adjective", "noun", "plural_noun", "verb", "animal", "verb_ending_in_ing", "plural_flower", "verb", "celestial_body", "adjective", "body_part", "adjective", "body_part", "animal", "adjective", "noun", "verb", "adverb", "verb_ending_in_ing", "adverb", "silly_name"]
-                }
-            },
-            {
-                "filename": "tech_support.json",
-                "data": {
-                    "title": "Tech Support Nightmare",
-                    "template": "Hello, thank you for calling [company_name] tech support. My name is [name], how may I [verb] you today? Your computer is doing WHAT with [plural_noun]? Have you tried [verb_ending_in_ing] it off and on again? OK, let's try something else. First, [verb] your [computer_part] and count to [number] [adverb]. Now, press the [color] button while [verb_ending_in_ing] the [noun]. Do you see a message about [plural_animal] on your screen? That's [adjective]! Next, try [verb_ending_in_ing] into the [adjective] drive. What's that? Your [noun] is now [verb_ending_in_ing] and making a sound like a [animal] [verb_ending_in_ing] underwater? Please [verb] your [software_name] and delete any files that look like [plural_noun]. Still not working? I'll need to transfer you to our [adjective] specialist who deals with [adjective] [plural_noun]. Please hold while I [verb] your call. *[adverb] plays [genre] music*",
-                    "placeholders": ["company_name", "name", "verb", "plural_noun", "verb_ending_in_ing", "verb", "computer_part", "number", "adverb", "color", "verb_ending_in_ing", "noun", "plural_animal", "adjective", "verb_ending_in_ing", "adjective", "noun", "verb_ending_in_ing", "animal", "verb_ending_in_ing", "verb", "software_name", "plural_noun", "adjective", "adjective", "plural_noun", "verb", "adverb", "genre"]
-                }
-            }
-        ]
-        
-        # Save templates to files
-        for template in templates:
-            filepath = os.path.join(templates_dir, template["filename"])
-            if not os.path.exists(filepath):
-                with open(filepath, "w") as file:
-                    json.dump(template["data"], file, indent=2)
+        write_example_templates("templates")
 
     def use_example_prompt(self, example):
         """Use an example prompt"""
         self.prompt_text.delete("1.0", tk.END)
         self.prompt_text.insert("1.0", example)
 
+    @metrics.timed("gui.generate_ai_template")
     def generate_ai_template(self):
         """Generate a Mad Lib template using OpenAI API"""
         api_key = self.api_key_var.get().strip()
@@ -893,108 +1111,194 @@ class MadLibsCreator:
         
         # Update UI to show we're working
         self.generate_btn.config(state=tk.DISABLED)
+        self.batch_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.use_template_btn.config(state=tk.DISABLED)
+        self.ai_progress.start(10)
         self.status_label.config(text="Generating template... Please wait.")
-        self.root.update()
+        self.ai_result_text.config(state=tk.NORMAL)
+        self.ai_result_text.delete("1.0", tk.END)
+        self.ai_result_text.config(state=tk.DISABLED)
+        
+        # Run the request on a worker thread so the window stays responsive.
+        # The answer streams in; the worker queues each piece and the Tk
+        # thread shows everything that arrived once per frame.
+        cancel_event = self.ai_cancel_event = threading.Event()
+        cache_mode = ai_cache.REFRESH if self.fresh_result_var.get() else ai_cache.USE
+        pieces = queue.Queue()
+        future = self.ai_executor.submit(self.ai_client.stream_template, api_key, prompt,
+                                         complexity, style, pieces.put,
+                                         cancel_event=cancel_event, cache_mode=cache_mode)
+        self.root.after(STREAM_FRAME_MS, self.check_ai_generation, future, cancel_event,
+                        pieces, PlaceholderScanner())
+    
+    def check_ai_generation(self, future, cancel_event, pieces, scanner):
+        """Show the text streamed so far, and the result once the worker is done"""
+        if cancel_event.is_set():
+            # Cancelled; the UI was already reset by cancel_ai_generation
+            return
         
+        text = []
         try:
-            # Import here to avoid requiring the package if not using this feature
-            import requests
-            import json
-            
-            # Prepare the API request
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key}"
-            }
-            
-            # Create the system prompt
-            system_prompt = f"""You are a creative Mad Libs template generator. 
-Create a {complexity.lower()} complexity, {style.lower()}-style Mad Lib template based on the user's description.
-
-Your response should be in JSON format with the following structure:
-{{
-  "title": "Title of the Mad Lib",
-  "template": "The template text with [placeholder] words in brackets",
-  "placeholders": ["placeholder1", "placeholder2", ...]
-}}
-
-Guidelines:
-1. Use [noun], [verb], [adjective], etc. for placeholders
-2. Be specific with placeholders like [animal], [color], [food], etc.
-3. Include 10-20 placeholders depending on complexity
-4. Make sure each placeholder in the template is also in the placeholders list
-5. The template should be coherent and fun to play
-6. Ensure the story makes sense when placeholders are filled in
-7. Use creative and varied placeholders
-"""
-            
-            # Prepare the API request data
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7
-            }
-            
-            # Make the API request
-            response = requests.post("https://api.openai.com/v1/chat/completions", 
-                                    headers=headers, data=json.dumps(data))
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                
-                # Try to parse the JSON response
-                try:
-                    # Find JSON in the response (in case there's additional text)
-                    import re
-                    json_match = re.search(r'({[\s\S]*})', content)
-                    if json_match:
-                        content = json_match.group(1)
-                    
-                    template_data = json.loads(content)
-                    
-                    # Validate the template data
-                    if "title" not in template_data or "template" not in template_data or "placeholders" not in template_data:
-                        raise ValueError("Missing required fields in template data")
-                    
-                    # Store the generated template
-                    self.generated_template = template_data
-                    
-                    # Display the template
-                    self.result_text.config(state=tk.NORMAL)
-                    self.result_text.delete("1.0", tk.END)
-                    self.result_text.insert("1.0", f"Title: {template_data['title']}\n\n")
-                    self.result_text.insert(tk.END, f"Template:\n{template_data['template']}\n\n")
-                    self.result_text.insert(tk.END, f"Placeholders:\n{', '.join(template_data['placeholders'])}")
-                    self.result_text.config(state=tk.DISABLED)
-                    
-                    # Enable the use template button
-                    self.use_template_btn.config(state=tk.NORMAL)
-                    
-                    self.status_label.config(text="Template generated successfully!")
-                except Exception as e:
-                    self.status_label.config(text=f"Error parsing response: {str(e)}")
-                    messagebox.showerror("Error", f"Failed to parse the generated template: {str(e)}")
-            else:
-                error_msg = f"API Error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    if "error" in error_data and "message" in error_data["error"]:
-                        error_msg = f"API Error: {error_data['error']['message']}"
-                except:
-                    pass
-                
-                self.status_label.config(text=error_msg)
-                messagebox.showerror("API Error", error_msg)
+            while True:
+                text.append(pieces.get_nowait())
+        except queue.Empty:
+            pass
+        if text:
+            text = "".join(text)
+            self.ai_result_text.config(state=tk.NORMAL)
+            self.ai_result_text.insert(tk.END, text)
+            self.ai_result_text.see(tk.END)
+            self.ai_result_text.config(state=tk.DISABLED)
+            scanner.feed(text)
+            # The JSON placeholders list ("[\"noun\", ...]") looks like a placeholder too
+            count = sum(1 for p in scanner.placeholders if '"' not in p)
+            self.status_label.config(text=f"Generating template... {count} placeholders so far.")
+        
+        if not future.done():
+            self.root.after(STREAM_FRAME_MS, self.check_ai_generation, future, cancel_event,
+                            pieces, scanner)
+            return
+        
+        self.finish_ai_generation()
+        
+        try:
+            template_data = future.result()
+        except TemplateParseError as e:
+            self.status_label.config(text=str(e))
+            messagebox.showerror("Error", f"Failed to parse the generated template: {str(e)}")
+            return
+        except AIError as e:
+            self.status_label.config(text=str(e))
+            messagebox.showerror("API Error", str(e))
+            return
         except Exception as e:
             self.status_label.config(text=f"Error: {str(e)}")
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
-        finally:
-            # Re-enable the generate button
-            self.generate_btn.config(state=tk.NORMAL)
+            return
+        
+        # Store the generated template
+        self.generated_template = template_data
+        
+        # Display the template
+        self.ai_result_text.config(state=tk.NORMAL)
+        self.ai_result_text.delete("1.0", tk.END)
+        self.ai_result_text.insert("1.0", f"Title: {template_data['title']}\n\n")
+        self.ai_result_text.insert(tk.END, f"Template:\n{template_data['template']}\n\n")
+        self.ai_result_text.insert(tk.END, f"Placeholders:\n{', '.join(template_data['placeholders'])}")
+        self.ai_result_text.config(state=tk.DISABLED)
+        
+        # Enable the use template button
+        self.use_template_btn.config(state=tk.NORMAL)
+        
+        self.status_label.config(text="Template generated successfully!")
+    
+    def cancel_ai_generation(self):
+        """Stop waiting for the current AI request"""
+        if self.ai_cancel_event:
+            self.ai_cancel_event.set()
+        self.finish_ai_generation()
+        self.status_label.config(text="Generation cancelled.")
+    
+    def finish_ai_generation(self):
+        # Re-enable the generate button
+        self.ai_progress.stop()
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.generate_btn.config(state=tk.NORMAL)
+        self.batch_btn.config(state=tk.NORMAL)
+        self.ai_cancel_event = None
+    
+    def generate_ai_batch(self):
+        """Generate a template for every prompt in a file, adding each to the library"""
+        api_key = self.api_key_var.get().strip()
+        if not api_key:
+            messagebox.showwarning("API Key Required", "Please enter your OpenAI API key.")
+            return
+        
+        prompts_path = filedialog.askopenfilename(
+            title="Open Prompts File",
+            filetypes=[("Text files", "*.txt"), ("JSON Lines files", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not prompts_path:
+            return
+        try:
+            with open(prompts_path, "r") as file:
+                jobs = list(read_prompts(file, self.complexity_var.get(), self.style_var.get()))
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Failed to read prompts: {str(e)}")
+            return
+        if not jobs:
+            messagebox.showwarning("No Prompts", "The file does not contain any prompts.")
+            return
+        
+        self.generate_btn.config(state=tk.DISABLED)
+        self.batch_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.ai_progress.start(10)
+        self.status_label.config(text=f"Generating 0 of {len(jobs)} templates...")
+        
+        # A driver thread runs the batch; results are handed to the Tk thread through a queue
+        cancel_event = self.ai_cancel_event = threading.Event()
+        cache_mode = ai_cache.REFRESH if self.fresh_result_var.get() else ai_cache.USE
+        results = queue.Queue()
+        
+        def run_batch():
+            try:
+                for result in iter_batch(self.ai_client, api_key, jobs, 4, RateLimiter(60, 40000),
+                                         cache_mode, cancel_event):
+                    results.put(result)
+            finally:
+                results.put(None)
+        
+        threading.Thread(target=run_batch, name="madlibs-ai-batch", daemon=True).start()
+        progress = {"done": 0, "failed": [], "total": len(jobs), "path": prompts_path}
+        self.root.after(50, self.check_ai_batch, results, progress, cancel_event)
+    
+    def check_ai_batch(self, results, progress, cancel_event):
+        """Add finished batch templates to the library and show progress"""
+        finished = False
+        try:
+            while True:
+                result = results.get_nowait()
+                if result is None:
+                    finished = True
+                    break
+                job, template_data, error = result
+                progress["done"] += 1
+                if error is not None:
+                    progress["failed"].append(failure_record(job, error))
+                    continue
+                template_data["title"] = unique_title(self.saved_madlibs, template_data["title"])
+                if self.put_madlib(template_data):
+                    self.madlib_added()
+        except queue.Empty:
+            pass
+        
+        if not finished:
+            if not cancel_event.is_set():
+                self.status_label.config(
+                    text=f"Generating {progress['done']} of {progress['total']} templates...")
+            self.root.after(50, self.check_ai_batch, results, progress, cancel_event)
+            return
+        
+        if not cancel_event.is_set():
+            self.finish_ai_generation()
+        failed = progress["failed"]
+        message = f"{progress['done'] - len(failed)} templates generated, {len(failed)} failed."
+        if failed:
+            # Failed prompts can be opened again as a batch to retry them
+            failures_path = progress["path"] + ".failed.jsonl"
+            try:
+                with open(failures_path, "w") as file:
+                    file.write("\n".join(failed) + "\n")
+                message += f" Failed prompts were saved to {os.path.basename(failures_path)}."
+            except OSError as e:
+                message += f" Failed prompts could not be saved: {str(e)}"
+        self.status_label.config(text=message)
+        
+        # Changes are autosaved in the background; ask where to save if no file is open yet
+        if not self.store and progress["done"] > len(failed):
+            self.save_as_madlibs()
 
     def use_generated_template(self):
         """Use the generated template in the Create tab"""
@@ -1021,9 +1325,26 @@ Guidelines:
         messagebox.showinfo("Success", "Generated template loaded into the Create tab. You can now edit it if needed.")
 
 def main():
-    root = tk.Tk()
-    app = MadLibsCreator(root)
-    root.mainloop()
+    args, rest = parse_args()
+    if rest:
+        run_headless(sys.argv[1:])
+    
+    with metrics.session(args.profile, args.metrics):
+        root = tk.Tk()
+        app = MadLibsCreator(root)
+        watchdog = None
+        if args.stalls:
+            watchdog = StallWatchdog(
+                root.after, threshold=args.stall_threshold / 1000,
+                on_stall=lambda stall: app.set_status(
+                    f"UI stalled {stall['lag_seconds'] * 1000:.0f} ms in {stall['callback'] or 'unknown'}"))
+            watchdog.start()
+        root.mainloop()
+        if watchdog:
+            watchdog.stop()
+            with open(args.stalls, "w") as file:
+                json.dump(watchdog.report(), file, indent=2)
+            print(watchdog.format_report(), file=sys.stderr)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
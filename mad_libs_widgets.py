@@ -0,0 +1,456 @@
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+
+
+class VirtualListbox(ttk.Frame):
+    """A scrollable list that only creates rows for the visible part.
+
+    ``items`` can be any sequence supporting len() and indexing; only the
+    rows in view are read from it. Changes to the sequence are applied with
+    item_inserted, item_removed and item_changed, which redraw at most one
+    screenful of rows no matter how long the list is.
+    """
+
+    def __init__(self, master, items=(), **listbox_options):
+        super().__init__(master)
+        self.items = items
+        self.top = 0  # index of the first visible item
+        self.selected = None  # index of the selected item
+
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<Configure>", lambda e: self.refresh())
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda e: self.yview("scroll", -3, "units"))
+        self.listbox.bind("<Button-5>", lambda e: self.yview("scroll", 3, "units"))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self._move_selection(-self.visible_rows()))
+        self.listbox.bind("<Next>", lambda e: self._move_selection(self.visible_rows()))
+
+    def visible_rows(self):
+        """Number of rows that fit in the listbox"""
+        bbox = self.listbox.bbox(0)
+        if bbox:
+            row_height = bbox[3] + 1
+        else:
+            row_height = tkfont.nametofont(self.listbox.cget("font")).metrics("linespace") + 1
+        return max(1, self.listbox.winfo_height() // row_height)
+
+    def set_items(self, items):
+        """Show a different sequence, scrolled to the top"""
+        self.items = items
+        self.top = 0
+        self.selected = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the visible rows from the items sequence"""
+        count = len(self.items)
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, count - rows))
+        end = min(count, self.top + rows + 1)  # one extra for a partly visible row
+
+        self.listbox.delete(0, tk.END)
+        if end > self.top:
+            self.listbox.insert(tk.END, *[self.items[i] for i in range(self.top, end)])
+        if self.selected is not None and self.top <= self.selected < end:
+            self.listbox.selection_set(self.selected - self.top)
+
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _is_visible(self, index):
+        return self.top <= index <= self.top + self.visible_rows()
+
+    def item_inserted(self, index):
+        """An item was inserted into the sequence at ``index``"""
+        if self.selected is not None and self.selected >= index:
+            self.selected += 1
+        if index < self.top:
+            # Keep the same rows in view
+            self.top += 1
+            self._update_scrollbar()
+        elif self._is_visible(index):
+            self.refresh()
+        else:
+            self._update_scrollbar()
+
+    def item_removed(self, index):
+        """The item at ``index`` was removed from the sequence"""
+        if self.selected == index:
+            self.selected = None
+        elif self.selected is not None and self.selected > index:
+            self.selected -= 1
+        if index < self.top:
+            self.top -= 1
+            self._update_scrollbar()
+        elif self._is_visible(index):
+            self.refresh()
+        else:
+            self._update_scrollbar()
+
+    def item_changed(self, index):
+        """The item at ``index`` was replaced"""
+        if not self._is_visible(index) or index >= len(self.items):
+            return
+        row = index - self.top
+        self.listbox.delete(row)
+        self.listbox.insert(row, self.items[index])
+        if self.selected == index:
+            self.listbox.selection_set(row)
+
+    def _update_scrollbar(self):
+        count = len(self.items)
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + self.visible_rows()) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)"""
+        count = len(self.items)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * count)
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+        return "break"
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.selected = self.top + selection[0]
+        self.event_generate("<<ListboxSelect>>")
+
+    def _move_selection(self, offset):
+        count = len(self.items)
+        if not count:
+            return "break"
+        index = 0 if self.selected is None else max(0, min(count - 1, self.selected + offset))
+        self.selection_set(index)
+        self.see(index)
+        self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def curselection(self):
+        """Index of the selected item as a tuple, like tk.Listbox"""
+        return () if self.selected is None else (self.selected,)
+
+    def selection_set(self, index):
+        self.selected = index
+        self.listbox.selection_clear(0, tk.END)
+        if self._is_visible(index):
+            self.listbox.selection_set(index - self.top)
+
+    def see(self, index):
+        """Scroll so that ``index`` is visible"""
+        rows = self.visible_rows()
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + rows:
+            self.top = index - rows + 1
+        else:
+            return
+        self.refresh()
+
+
+class VirtualCombobox(ttk.Frame):
+    """A read-only combobox whose drop-down is a VirtualListbox.
+
+    Works like ttk.Combobox with state="readonly" (get, current) but never
+    copies the whole list of values into Tk, so it stays fast with very
+    long lists. ``command`` is called when the user picks an item.
+    """
+
+    def __init__(self, master, items=(), command=None, height=12):
+        super().__init__(master)
+        self.items = items
+        self.command = command
+        self.height = height
+        self.index = -1
+        self.popup = None
+
+        self.value = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.value, state="readonly")
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.entry.bind("<Button-1>", lambda e: self.toggle_popup())
+        self.entry.bind("<Down>", lambda e: self.toggle_popup())
+
+        ttk.Button(self, text="▼", width=2, command=self.toggle_popup).pack(side=tk.RIGHT)
+
+    def get(self):
+        return self.value.get()
+
+    def current(self, index=None):
+        """Get or set the index of the current item, like ttk.Combobox"""
+        if index is None:
+            return self.index
+        self.index = index
+        self.value.set(self.items[index] if 0 <= index < len(self.items) else "")
+
+    def set_items(self, items):
+        self.items = items
+        self.current(-1)
+        self.close_popup()
+
+    def refresh(self):
+        if self.popup:
+            self.popup_list.refresh()
+
+    def item_inserted(self, index):
+        if 0 <= index <= self.index:
+            self.index += 1
+        if self.popup:
+            self.popup_list.item_inserted(index)
+
+    def item_removed(self, index):
+        if index == self.index:
+            self.current(-1)
+        elif 0 <= index < self.index:
+            self.index -= 1
+        if self.popup:
+            self.popup_list.item_removed(index)
+
+    def item_changed(self, index):
+        if index == self.index:
+            self.current(index)
+        if self.popup:
+            self.popup_list.item_changed(index)
+
+    def toggle_popup(self):
+        if self.popup:
+            self.close_popup()
+            return
+        if not len(self.items):
+            return
+
+        self.popup = tk.Toplevel(self)
+        self.popup.overrideredirect(True)
+        self.popup.transient(self.winfo_toplevel())
+
+        self.popup_list = VirtualListbox(self.popup, self.items, height=self.height)
+        self.popup_list.pack(fill=tk.BOTH, expand=True)
+        self.popup_list.listbox.bind("<Return>", lambda e: self._choose())
+        self.popup_list.listbox.bind("<Escape>", lambda e: self.close_popup())
+        self.popup_list.listbox.bind("<ButtonRelease-1>", lambda e: self._choose())
+
+        self.popup.geometry(f"{self.winfo_width()}x{self.popup_list.listbox.winfo_reqheight()}"
+                            f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self.popup.update_idletasks()
+        if self.index >= 0:
+            self.popup_list.selection_set(self.index)
+            self.popup_list.see(self.index)
+        self.popup_list.refresh()
+
+        # Close the popup when clicking anywhere else
+        self.popup.grab_set()
+        self.popup.bind("<Button-1>", self._on_popup_click)
+        self.popup_list.listbox.focus_set()
+
+    def close_popup(self):
+        if self.popup:
+            self.popup.grab_release()
+            self.popup.destroy()
+            self.popup = None
+
+    def _on_popup_click(self, event):
+        x, y = event.x_root, event.y_root
+        popup = self.popup
+        if not (popup.winfo_rootx() <= x < popup.winfo_rootx() + popup.winfo_width()
+                and popup.winfo_rooty() <= y < popup.winfo_rooty() + popup.winfo_height()):
+            self.close_popup()
+
+    def _choose(self):
+        selection = self.popup_list.curselection()
+        self.close_popup()
+        if not selection:
+            return
+        self.current(selection[0])
+        if self.command:
+            self.command()
+
+
+class _FormRow:
+    """One pooled row of an InputForm: a label and an entry in a frame."""
+
+    def __init__(self, form, canvas):
+        self.index = None  # field shown in this row, None while hidden
+        self.text = None
+        self.frame = ttk.Frame(canvas)
+        self.label = ttk.Label(self.frame, width=form.label_width)
+        self.label.pack(side=tk.LEFT, padx=5, pady=2)
+        self.var = tk.StringVar()
+        self.entry = ttk.Entry(self.frame, textvariable=self.var)
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
+        self.window = canvas.create_window(0, 0, window=self.frame, anchor=tk.NW, state=tk.HIDDEN)
+
+
+class InputForm(ttk.Frame):
+    """A scrollable form with a labelled entry for each field.
+
+    Rows are pooled: only enough rows for the visible part of the form
+    are created, and scrolling or showing different fields reuses them.
+    The text typed for every field is kept in ``values``, so switching
+    to a form with hundreds of fields only touches a screenful of widgets.
+    """
+
+    def __init__(self, master, label_width=20):
+        super().__init__(master)
+        self.label_width = label_width
+        self.fields = []
+        self.values = []
+        self.top = 0  # index of the first visible field
+        self.rows = []
+        self.row_height = None
+        self._binding = False
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self._bind_scrolling(self.canvas)
+
+    def _bind_scrolling(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        widget.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+
+    def _new_row(self):
+        row = _FormRow(self, self.canvas)
+        row.var.trace_add("write", lambda *args: self._on_write(row))
+        for widget in (row.frame, row.label, row.entry):
+            self._bind_scrolling(widget)
+        row.entry.bind("<Tab>", lambda e: self._focus_next(row, 1))
+        row.entry.bind("<Shift-Tab>", lambda e: self._focus_next(row, -1))
+        row.entry.bind("<ISO_Left_Tab>", lambda e: self._focus_next(row, -1))
+        self.rows.append(row)
+        if self.row_height is None:
+            row.frame.update_idletasks()
+            self.row_height = max(1, row.frame.winfo_reqheight())
+        return row
+
+    def visible_rows(self):
+        if self.row_height is None:
+            return 1
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def set_fields(self, fields):
+        """Show a new set of fields, all empty, scrolled to the top"""
+        self.fields = list(fields)
+        self.values = [""] * len(self.fields)
+        self.top = 0
+        self.refresh()
+
+    def get_values(self):
+        """Mapping of field -> text typed for it"""
+        return dict(zip(self.fields, self.values))
+
+    def refresh(self):
+        """Show the visible fields in the pooled rows"""
+        count = len(self.fields)
+        if count and not self.rows:
+            self._new_row()  # also measures the row height
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, count - rows))
+        shown = min(count - self.top, rows + 1)  # one extra for a partly visible row
+        while len(self.rows) < shown:
+            self._new_row()
+
+        width = self.canvas.winfo_width()
+        self._binding = True
+        try:
+            for i, row in enumerate(self.rows):
+                if i < shown:
+                    index = self.top + i
+                    row.index = index
+                    text = f"{self.fields[index]}:"
+                    if row.text != text:
+                        row.text = text
+                        row.label.config(text=text)
+                    if row.var.get() != self.values[index]:
+                        row.var.set(self.values[index])
+                    self.canvas.coords(row.window, 0, i * self.row_height)
+                    self.canvas.itemconfigure(row.window, state=tk.NORMAL, width=width)
+                elif row.index is not None:
+                    # Surplus rows are hidden, not destroyed
+                    row.index = None
+                    self.canvas.itemconfigure(row.window, state=tk.HIDDEN)
+        finally:
+            self._binding = False
+
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_write(self, row):
+        if not self._binding and row.index is not None:
+            self.values[row.index] = row.var.get()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, what)"""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.fields))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+        return "break"
+
+    def see(self, index):
+        """Scroll so that field ``index`` is fully visible"""
+        rows = self.visible_rows()
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + rows:
+            self.top = index - rows + 1
+        else:
+            return
+        self.refresh()
+
+    def focus_field(self, index):
+        """Scroll to field ``index`` and put the cursor in its entry"""
+        self.see(index)
+        self.rows[index - self.top].entry.focus_set()
+
+    def _focus_next(self, row, offset):
+        index = row.index + offset
+        if 0 <= index < len(self.fields):
+            self.focus_field(index)
+            return "break"
+        # Past the first or last field: let Tk move focus out of the form
+        return None
+
+
+def sync_listbox(listbox, items):
+    """Make a tk.Listbox show ``items``, touching only the rows that differ"""
+    old = listbox.get(0, tk.END)
+    limit = min(len(old), len(items))
+    start = 0
+    while start < limit and old[start] == items[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == items[-1 - end]:
+        end += 1
+    if start < len(old) - end:
+        listbox.delete(start, len(old) - end - 1)
+    if start < len(items) - end:
+        listbox.insert(start, *items[start:len(items) - end])
@@ -0,0 +1,42 @@
+"""Core Mad Libs engine, usable without tkinter.
+
+Names are imported from their submodules on first use, so a headless
+command only pays for the parts of the package it actually touches.
+"""
+import importlib
+
+_EXPORTS = {
+    "engine": ["CompiledTemplate", "PlaceholderIndex", "PlaceholderScanner", "compile_template",
+               "parse_template", "render_template"],
+    "batch": ["RenderError", "load_library", "render_fill_line", "render_lines",
+              "render_lines_parallel"],
+    "library": ["MadLibsLibrary", "TitleView"],
+    "records": ["MadLibRecord", "PlaceholderVocabulary"],
+    "search": ["SearchIndex", "parse_query"],
+    "storage": ["JournaledStore", "atomic_write_json", "iter_json_array", "open_store"],
+    "sqlite_store": ["SQLiteLibrary", "SQLiteStore"],
+    "autosave": ["Autosaver"],
+    "catalog": ["TemplateCatalog", "TemplateEntry"],
+    "ai": ["AIClient", "AIError", "CircuitBreaker", "CircuitOpenError", "GenerationCancelled",
+           "SingleFlight", "TemplateExtractor", "TemplateParseError"],
+    "ai_cache": ["ResponseCache"],
+    "ai_batch": ["RateLimiter", "TokenBucket", "iter_batch", "read_prompts"],
+    "watchdog": ["StallWatchdog"],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
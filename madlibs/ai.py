@@ -0,0 +1,632 @@
+"""Generate Mad Lib templates with the OpenAI chat completions API.
+
+Runs without tkinter so it can be used from worker threads and headless
+tools. ``requests`` is only imported when a request is made, so the rest
+of the app works without it installed.
+"""
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from . import ai_cache, metrics
+
+# Point MADLIBS_AI_ENDPOINT at a local stand-in server for testing
+ENDPOINT = os.environ.get("MADLIBS_AI_ENDPOINT", "https://api.openai.com/v1/chat/completions")
+MODEL = "gpt-3.5-turbo"
+TEMPERATURE = 0.7
+
+# Seconds to wait for the connection, and between bytes of the response
+CONNECT_TIMEOUT = float(os.environ.get("MADLIBS_AI_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.environ.get("MADLIBS_AI_READ_TIMEOUT", 60))
+
+
+class AIError(Exception):
+    """The API call failed; the message is suitable for showing to the user."""
+
+
+class TemplateParseError(AIError):
+    """The model answered, but not with a usable template."""
+
+
+class GenerationCancelled(AIError):
+    """The request was cancelled before it finished."""
+
+
+class CircuitOpenError(AIError):
+    """The service failed too often recently; the call was not attempted."""
+
+
+def build_system_prompt(complexity, style):
+    return f"""You are a creative Mad Libs template generator. 
+Create a {complexity.lower()} complexity, {style.lower()}-style Mad Lib template based on the user's description.
+
+Your response should be in JSON format with the following structure:
+{{
+  "title": "Title of the Mad Lib",
+  "template": "The template text with [placeholder] words in brackets",
+  "placeholders": ["placeholder1", "placeholder2", ...]
+}}
+
+Guidelines:
+1. Use [noun], [verb], [adjective], etc. for placeholders
+2. Be specific with placeholders like [animal], [color], [food], etc.
+3. Include 10-20 placeholders depending on complexity
+4. Make sure each placeholder in the template is also in the placeholders list
+5. The template should be coherent and fun to play
+6. Ensure the story makes sense when placeholders are filled in
+7. Use creative and varied placeholders
+"""
+
+
+def build_request(prompt, complexity, style, model=MODEL):
+    """Return the JSON body for a chat completions request"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": build_system_prompt(complexity, style)},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": TEMPERATURE
+    }
+
+
+# Give up on an object that grows past this many characters without closing
+MAX_OBJECT_CHARS = 1024 * 1024
+
+_OUTSIDE_STRING = re.compile(r'[{}"]')
+_INSIDE_STRING = re.compile(r'["\\]')
+
+
+def is_template(value):
+    """Whether a parsed JSON value has a string title and template and a list of placeholder names"""
+    return (isinstance(value, dict)
+            and isinstance(value.get("title"), str)
+            and isinstance(value.get("template"), str)
+            and isinstance(value.get("placeholders"), list)
+            and all(isinstance(name, str) for name in value["placeholders"]))
+
+
+def _find_template(value):
+    """The first template dict in a parsed JSON value, searching nested values"""
+    if is_template(value):
+        return value
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for child in children:
+        found = _find_template(child)
+        if found is not None:
+            return found
+    return None
+
+
+class TemplateExtractor:
+    """Find the template JSON object in the model's answer.
+
+    Text can be fed in pieces as it streams in. The scanner tracks open
+    braces and JSON strings (with escapes), so it runs in linear time
+    and braces in prose around or inside the JSON don't confuse it. The
+    first balanced object holding a title, template and placeholders
+    (possibly nested in a wrapper object) becomes ``result``; an object
+    is tried as soon as it closes, even if an unmatched brace in the
+    prose before it is still open.
+    """
+
+    def __init__(self, max_object_chars=MAX_OBJECT_CHARS):
+        self.max_object_chars = max_object_chars
+        self.result = None
+        self.objects_seen = 0
+        self._text = ""   # the text from the outermost open brace on
+        self._pos = 0
+        self._open = []   # offsets in _text of the braces still open
+        self._in_string = False
+
+    def feed(self, text):
+        """Scan more text; returns the template once it has been found"""
+        if self.result is not None:
+            return self.result
+        if not self._open:
+            # Between objects: only the next opening brace matters
+            start = text.find("{")
+            if start < 0:
+                return None
+            text = text[start:]
+        self._text += text
+        self._scan()
+        return self.result
+
+    def _scan(self):
+        text = self._text
+        pos = self._pos
+        open_braces = self._open
+        while True:
+            pattern = _INSIDE_STRING if self._in_string else _OUTSIDE_STRING
+            match = pattern.search(text, pos)
+            if match is None:
+                break
+            char = match.group()
+            pos = match.end()
+            if self._in_string:
+                if char == "\\":
+                    if pos == len(text):
+                        # The escaped character hasn't arrived yet
+                        pos -= 1
+                        break
+                    pos += 1
+                else:
+                    self._in_string = False
+            elif char == '"':
+                if open_braces:
+                    self._in_string = True
+            elif char == "{":
+                open_braces.append(match.start())
+            elif open_braces:
+                self._close_object(text[open_braces.pop():pos])
+                if self.result is not None:
+                    break
+        # Braces left open this long are most likely unbalanced braces or
+        # quotes in prose; give up on the outermost ones
+        while open_braces and len(text) - open_braces[0] > self.max_object_chars:
+            del open_braces[0]
+        if not open_braces:
+            text, pos, self._in_string = "", 0, False
+        elif open_braces[0]:
+            start = open_braces[0]
+            text, pos = text[start:], pos - start
+            open_braces[:] = [offset - start for offset in open_braces]
+        self._text = text
+        self._pos = pos
+
+    def finish(self):
+        """Call once the whole answer has been fed; returns the template or None.
+
+        An unmatched brace followed by an odd number of quotes (``He said
+        "{" and {...}``) swaps what the scan takes to be inside strings,
+        so the real object never closes. If no template was found, the
+        text is scanned again from just after the first brace still open,
+        and so on until a template turns up or no brace is left open.
+        """
+        extractor = self
+        while self.result is None and extractor._open:
+            retry = TemplateExtractor(self.max_object_chars)
+            retry.feed(extractor._text[extractor._open[0] + 1:])
+            self.objects_seen += retry.objects_seen
+            self.result = retry.result
+            extractor = retry
+        return self.result
+
+    def _close_object(self, candidate):
+        self.objects_seen += 1
+        if '"placeholders"' not in candidate:
+            # Can't hold a template; don't pay for parsing it
+            return
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            return
+        self.result = _find_template(value)
+
+
+def parse_template(content):
+    """Extract and validate the template JSON from the model's answer"""
+    extractor = TemplateExtractor()
+    extractor.feed(content)
+    return _extracted_template(extractor)
+
+
+def _extracted_template(extractor):
+    if extractor.finish() is None:
+        if extractor.objects_seen:
+            raise TemplateParseError("Error parsing response: Missing required fields in template data")
+        raise TemplateParseError("Error parsing response: No template JSON found in the response")
+    return extractor.result
+
+
+def _error_message(status_code, body):
+    error_msg = f"API Error: {status_code}"
+    try:
+        error_data = json.loads(body)
+        if "error" in error_data and "message" in error_data["error"]:
+            error_msg = f"API Error: {error_data['error']['message']}"
+    except Exception:
+        pass
+    return error_msg
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds asked for by a Retry-After header, or None"""
+    import email.utils
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """Stop calling a failing service for a while.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    calls fail fast for ``reset_timeout`` seconds. Then one call is let
+    through as a trial while the others keep failing fast; if it
+    succeeds the breaker closes again, if it fails the breaker stays
+    open for another ``reset_timeout``. A trial call that never reports
+    back (cancelled, or a non-retryable error) lets another one through
+    after ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        """Seconds until calls are allowed again, 0 if this call may go ahead"""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            now = time.monotonic()
+            remaining = self.opened_at + self.reset_timeout - now
+            if remaining > 0:
+                return remaining
+            # This caller makes the trial call; restart the wait for everyone else
+            self.opened_at = now
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Let concurrent calls with the same key share one call.
+
+    The first caller for a key runs the function; callers that arrive
+    while it is running wait for it and get the same result or exception.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, cancel_event=None):
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+
+            if leader:
+                try:
+                    result = function()
+                except BaseException as e:
+                    self._finish(key)
+                    future.set_exception(e)
+                    raise
+                self._finish(key)
+                future.set_result(result)
+                return result
+
+            try:
+                return _wait_for(future, cancel_event)
+            except GenerationCancelled:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+                # The call we joined was cancelled, but this one wasn't: run it again
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+
+
+def _wait_for(future, cancel_event):
+    """future.result(), giving up with GenerationCancelled on ``cancel_event``"""
+    while True:
+        try:
+            return future.result(timeout=0.1)
+        except FutureTimeoutError:
+            _check_cancelled(cancel_event)
+
+
+class AIClient:
+    """Reusable client for the chat completions API.
+
+    Keeps a pooled keep-alive HTTP session, retries rate limits (429),
+    server errors and connection failures with exponential backoff and
+    jitter, honours Retry-After, and fails fast through a circuit breaker
+    when the service keeps failing. Identical requests made at the same
+    time share one API call. Safe to share between threads.
+    """
+
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, endpoint=None, model=MODEL, timeout=None, max_retries=3,
+                 backoff_base=0.5, backoff_max=20.0, max_retry_after=60.0,
+                 breaker=None, pool_size=10, cache=None):
+        self.endpoint = endpoint or ENDPOINT
+        self.model = model
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+        # Optional ai_cache.ResponseCache for generated templates
+        self.cache = cache
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._in_flight = SingleFlight()
+
+    def session(self):
+        """The shared requests session, created on first use"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def backoff(self, attempt):
+        """Delay before retry number ``attempt`` (0-based): full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, api_key, data, cancel_event, read_ok=None):
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        }
+        # Stream the body so a cancel does not have to wait for all of it
+        with self.session().post(self.endpoint, headers=headers, data=json.dumps(data),
+                                 timeout=self.timeout, stream=True) as response:
+            if response.status_code == 200 and read_ok is not None:
+                return response.status_code, response.headers, read_ok(response)
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=8192):
+                _check_cancelled(cancel_event)
+                body.extend(chunk)
+            _check_cancelled(cancel_event)
+            return response.status_code, response.headers, bytes(body)
+
+    def complete(self, api_key, data, cancel_event=None, read_ok=None):
+        """POST a chat completions request and return the parsed JSON response.
+
+        If given, ``read_ok`` reads a successful response instead and its
+        return value is returned. Failures while it runs are not retried.
+        """
+        import requests
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            retry_in = self.breaker.retry_in()
+            if retry_in > 0:
+                if error is not None:
+                    # The breaker opened while retrying; report the real failure
+                    raise error
+                raise CircuitOpenError(
+                    f"Error: The AI service keeps failing; try again in {retry_in:.0f} seconds")
+
+            retry_after = None
+            metrics.count("ai_requests")
+            try:
+                with metrics.span("ai.request"):
+                    status_code, headers, body = self._post(api_key, data, cancel_event, read_ok)
+            except requests.Timeout:
+                error = AIError("Error: The request timed out")
+            except requests.RequestException as e:
+                error = AIError(f"Error: {str(e)}")
+            else:
+                if status_code == 200:
+                    self.breaker.record_success()
+                    if read_ok is not None:
+                        return body
+                    try:
+                        return json.loads(body)
+                    except ValueError as e:
+                        raise AIError(f"Error: Unexpected API response ({str(e)})")
+                error = AIError(_error_message(status_code, body))
+                if status_code not in self.RETRY_STATUSES:
+                    # Bad key, bad request, ...: retrying will not help
+                    raise error
+                retry_after = parse_retry_after(headers.get("Retry-After"))
+
+            self.breaker.record_failure()
+            metrics.count("ai_failures")
+            if attempt == self.max_retries:
+                raise error
+            if retry_after is None:
+                delay = self.backoff(attempt)
+            elif retry_after > self.max_retry_after:
+                raise error
+            else:
+                delay = retry_after
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise GenerationCancelled("Generation cancelled")
+            else:
+                time.sleep(delay)
+
+    def _cache_key(self, data, prompt, complexity, style):
+        return ai_cache.cache_key(self.model, data["messages"][0]["content"], prompt,
+                                  complexity, style, TEMPERATURE)
+
+    def _flight_key(self, data, prompt, complexity, style, cache_mode):
+        # A caller asking for a fresh result must not be handed a cached one
+        return (self._cache_key(data, prompt, complexity, style), cache_mode == ai_cache.USE)
+
+    def generate_template(self, api_key, prompt, complexity, style, cancel_event=None,
+                          cache_mode=ai_cache.USE, on_usage=None, rate_limiter=None):
+        """Ask the API for a template and return it as a dict.
+
+        If ``cancel_event`` (a threading.Event) gets set, GenerationCancelled
+        is raised as soon as the next piece of the response arrives.
+        ``cache_mode`` is one of ai_cache.USE, REFRESH or BYPASS.
+        ``on_usage`` is called with the total tokens the API reports using.
+        ``rate_limiter`` (an ai_batch.RateLimiter) is waited on before the
+        API is called; cached and shared results don't count against it.
+        """
+        data = build_request(prompt, complexity, style, self.model)
+
+        def request():
+            key, template_data = self._lookup(data, prompt, complexity, style, cache_mode)
+            if template_data is not None:
+                return template_data
+
+            estimated = None
+            if rate_limiter is not None:
+                estimated = rate_limiter.acquire_request(data, cancel_event)
+            result = self.complete(api_key, data, cancel_event)
+            used = (result.get("usage") or {}).get("total_tokens")
+            if rate_limiter is not None:
+                rate_limiter.settle(estimated, used)
+            if on_usage is not None:
+                on_usage(used)
+            try:
+                content = result["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError) as e:
+                raise AIError(f"Error: Unexpected API response ({str(e)})")
+            return self._store(key, parse_template(content))
+
+        flight_key = self._flight_key(data, prompt, complexity, style, cache_mode)
+        # Callers that shared the call each get their own copy
+        return copy.deepcopy(self._in_flight.do(flight_key, request, cancel_event))
+
+    def stream_template(self, api_key, prompt, complexity, style, on_text, cancel_event=None,
+                        cache_mode=ai_cache.USE):
+        """Like generate_template, but streams the answer as it is generated.
+
+        ``on_text`` is called from this thread with each piece of the
+        model's answer as it arrives. A cached template, or one shared with
+        an identical request that was already running, is returned without
+        any calls to ``on_text``.
+        """
+        data = build_request(prompt, complexity, style, self.model)
+
+        def read_stream(response):
+            import requests
+
+            extractor = TemplateExtractor()
+            try:
+                for event in iter_sse_events(response.iter_content(chunk_size=None)):
+                    _check_cancelled(cancel_event)
+                    if event == "[DONE]":
+                        break
+                    text = _stream_delta(event)
+                    if text:
+                        on_text(text)
+                        if extractor.feed(text) is not None:
+                            # Don't wait for (or pay for) any chatter after the template
+                            break
+            except requests.RequestException as e:
+                # Part of the answer was already shown, so don't retry
+                raise AIError(f"Error: The response was interrupted ({str(e)})")
+            _check_cancelled(cancel_event)
+            return extractor
+
+        def request():
+            key, template_data = self._lookup(data, prompt, complexity, style, cache_mode)
+            if template_data is not None:
+                return template_data
+            extractor = self.complete(api_key, dict(data, stream=True), cancel_event, read_stream)
+            return self._store(key, _extracted_template(extractor))
+
+        flight_key = self._flight_key(data, prompt, complexity, style, cache_mode)
+        # Callers that shared the call each get their own copy
+        return copy.deepcopy(self._in_flight.do(flight_key, request, cancel_event))
+
+    def _lookup(self, data, prompt, complexity, style, cache_mode):
+        """Return (cache key or None, cached template or None)"""
+        if self.cache is None or cache_mode == ai_cache.BYPASS:
+            return None, None
+        key = self._cache_key(data, prompt, complexity, style)
+        if cache_mode == ai_cache.USE:
+            template_data = self.cache.get(key)
+            if template_data is not None:
+                return key, template_data
+        return key, None
+
+    def _store(self, key, template_data):
+        if key is not None:
+            try:
+                self.cache.put(key, template_data)
+            except OSError:
+                # A cache that cannot be written is not worth failing over
+                pass
+        return template_data
+
+
+def iter_sse_events(chunks):
+    """Yield the data of each server-sent event in a stream of byte chunks"""
+    pending = b""
+    data = []
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line = line.rstrip(b"\r")
+            if not line:
+                # A blank line ends the event
+                if data:
+                    yield "\n".join(data)
+                    data = []
+            elif line.startswith(b"data:"):
+                value = line[5:]
+                if value.startswith(b" "):
+                    value = value[1:]
+                data.append(value.decode("utf-8"))
+            # Comments (":...") and other fields (event, id, retry) are not used
+    if data:
+        yield "\n".join(data)
+
+
+def _stream_delta(event):
+    """The answer text in one streamed chat completions chunk"""
+    try:
+        chunk = json.loads(event)
+    except ValueError as e:
+        raise AIError(f"Error: Unexpected API response ({str(e)})")
+    if "error" in chunk:
+        message = (chunk["error"] or {}).get("message") or "unknown error"
+        raise AIError(f"API Error: {message}")
+    try:
+        return chunk["choices"][0]["delta"].get("content")
+    except (KeyError, IndexError, TypeError, AttributeError):
+        # Role-only and finish chunks carry no text
+        return None
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise GenerationCancelled("Generation cancelled")
@@ -0,0 +1,173 @@
+"""Generate many AI templates from a list of prompts.
+
+Prompts run on a bounded thread pool and are paced by token buckets for
+requests per minute and tokens per minute, so a batch runs as fast as the
+provider's rate limits allow without tripping them.
+"""
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import ai_cache
+from .ai import GenerationCancelled
+
+# Rough allowance for the completion when estimating a request's tokens
+COMPLETION_TOKENS = 800
+
+
+class TokenBucket:
+    """Allow ``rate_per_minute`` units per minute, in bursts up to ``capacity``."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, cancel_event=None):
+        """Block until ``amount`` units are available and take them"""
+        # A request bigger than the bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                delay = (amount - self.tokens) / self.rate
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise GenerationCancelled("Generation cancelled")
+            else:
+                time.sleep(delay)
+
+    def adjust(self, amount):
+        """Take (or give back, if negative) units after the fact"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits; either may be None."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, estimated_tokens, cancel_event=None):
+        if self.requests:
+            self.requests.acquire(1, cancel_event)
+        if self.tokens:
+            self.tokens.acquire(estimated_tokens, cancel_event)
+
+    def acquire_request(self, data, cancel_event=None):
+        """Wait for room for a chat completions request; returns its estimated tokens"""
+        estimated = estimate_tokens(data)
+        self.acquire(estimated, cancel_event)
+        return estimated
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the real usage is known"""
+        if self.tokens and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+
+def estimate_tokens(data):
+    """Rough token count for a request body: about 4 characters per token"""
+    prompt_chars = sum(len(message["content"]) for message in data["messages"])
+    return prompt_chars // 4 + COMPLETION_TOKENS
+
+
+def read_prompts(file, complexity="Medium", style="Funny"):
+    """Yield batch jobs from a prompts file.
+
+    Each line is either plain prompt text or a JSON object with "prompt"
+    and optional "complexity" and "style". Failure files written by a
+    batch use the same format, so they can be fed back in to retry.
+    """
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        job = None
+        if line.startswith("{"):
+            try:
+                job = json.loads(line)
+            except ValueError:
+                pass
+        if not isinstance(job, dict) or "prompt" not in job:
+            job = {"prompt": line}
+        yield {
+            "prompt": job["prompt"],
+            "complexity": job.get("complexity") or complexity,
+            "style": job.get("style") or style,
+        }
+
+
+def failure_record(job, error):
+    """JSON line for a failed job, readable again by read_prompts"""
+    return json.dumps(dict(job, error=str(error)))
+
+
+def unique_title(library, title):
+    """Return ``title``, numbered if the library already has it"""
+    if title not in library:
+        return title
+    number = 2
+    while f"{title} ({number})" in library:
+        number += 1
+    return f"{title} ({number})"
+
+
+def iter_batch(client, api_key, jobs, concurrency=4, limiter=None,
+               cache_mode=ai_cache.USE, cancel_event=None):
+    """Run jobs on a thread pool and yield (job, template, error) as they finish.
+
+    Results come back in completion order on the calling thread, so the
+    caller can save each one as soon as it arrives. At most twice
+    ``concurrency`` jobs are queued at a time, so long prompt files are
+    streamed rather than read up front.
+    """
+    limiter = limiter or RateLimiter()
+
+    def run(job):
+        # Cached prompts and duplicates of running prompts don't count against the limits
+        return client.generate_template(
+            api_key, job["prompt"], job["complexity"], job["style"],
+            cancel_event=cancel_event, cache_mode=cache_mode, rate_limiter=limiter)
+
+    jobs = iter(jobs)
+    pending = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="madlibs-batch") as executor:
+        def submit_more():
+            while len(pending) < concurrency * 2:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                job = next(jobs, None)
+                if job is None:
+                    return
+                pending[executor.submit(run, job)] = job
+
+        submit_more()
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    yield job, future.result(), None
+                except Exception as e:
+                    yield job, None, e
+            submit_more()
+
+    if cancel_event is not None and cancel_event.is_set():
+        # Report the jobs that never ran, so they can be retried
+        for job in jobs:
+            yield job, None, GenerationCancelled("Generation cancelled")
@@ -0,0 +1,132 @@
+"""Cache of AI-generated templates, in memory and on disk.
+
+Generating the same prompt with the same settings again returns the
+stored template instead of making a new paid API call.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .storage import atomic_write_json
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".madlibs_cache", "ai")
+
+# Cache modes for AIClient.generate_template
+USE = "use"          # return a cached result if there is one
+REFRESH = "refresh"  # always call the API, then store the new result
+BYPASS = "bypass"    # always call the API and leave the cache alone
+
+
+def cache_key(model, system_prompt, prompt, complexity, style, temperature):
+    """Hash everything that influences the generated template"""
+    material = json.dumps([model, system_prompt, prompt, complexity, style, temperature])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU in memory in front of one JSON file per entry on disk.
+
+    Disk entries older than ``max_age`` seconds are ignored and removed,
+    and the oldest files are evicted once the directory holds more than
+    ``max_bytes``. Safe to share between threads.
+    """
+
+    def __init__(self, directory=CACHE_DIR, memory_entries=256,
+                 max_bytes=50 * 1024 * 1024, max_age=30 * 24 * 3600):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Return a copy of the cached value for ``key``, or None"""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(value)
+
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                self._remove(path)
+                return None
+            with open(path, "r") as file:
+                value = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        self._remember(key, copy.deepcopy(value))
+        return value
+
+    def put(self, key, value):
+        # Keep a copy, so the caller can't change what later hits return
+        self._remember(key, copy.deepcopy(value))
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        atomic_write_json(path, value, indent=None)
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += os.path.getsize(path)
+        self._evict()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def _files(self):
+        files = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _evict(self):
+        """Drop expired files, then the oldest ones while over max_bytes"""
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_bytes:
+                return
+            files = sorted(self._files())
+            now = time.time()
+            total = sum(size for _, size, _ in files)
+            for mtime, size, path in files:
+                if total <= self.max_bytes and now - mtime <= self.max_age:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.directory):
+            for _, _, path in self._files():
+                self._remove(path)
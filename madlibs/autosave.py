@@ -0,0 +1,92 @@
+"""Background autosave for a library store.
+
+Edits only mark the store dirty. A worker thread waits until the edits
+have settled for a short while and then flushes everything in one go, so
+a burst of saves costs one write and the UI thread never touches the disk.
+"""
+import threading
+import time
+
+
+class Autosaver:
+    """Flush a store on a worker thread, coalescing bursts of changes.
+
+    ``on_status`` is called from the worker thread with a short message
+    after every save; GUI callers must hand it over to their own thread.
+    """
+
+    def __init__(self, store, delay=0.5, max_delay=3.0, on_status=None):
+        self.store = store
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_status = on_status
+        self._condition = threading.Condition()
+        self._dirty_since = None
+        self._last_change = None
+        self._snapshot = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="madlibs-autosave", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        """Note that the store has unsaved changes."""
+        with self._condition:
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_change = now
+            self._condition.notify()
+
+    def request_save(self):
+        """Write a full snapshot as soon as possible."""
+        with self._condition:
+            now = time.monotonic()
+            self._snapshot = True
+            self._dirty_since = self._last_change = now - self.max_delay
+            self._condition.notify()
+
+    def close(self, timeout=None):
+        """Stop the worker after it has saved any outstanding changes."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _due(self, now):
+        if self._dirty_since is None:
+            return None
+        return min(self._last_change + self.delay, self._dirty_since + self.max_delay) - now
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    wait = self._due(time.monotonic())
+                    if self._closed or (wait is not None and wait <= 0):
+                        break
+                    self._condition.wait(wait)
+                snapshot = self._snapshot
+                has_work = self._dirty_since is not None or self.store.dirty
+                closed = self._closed
+                self._dirty_since = self._last_change = None
+                self._snapshot = False
+
+            if has_work or snapshot:
+                self._save(snapshot)
+            if closed:
+                return
+
+    def _save(self, snapshot):
+        try:
+            if snapshot:
+                self.store.save()
+            else:
+                self.store.flush()
+        except Exception as e:
+            self._report(f"Autosave failed: {e}")
+        else:
+            self._report(f"Saved to {self.store.path} at {time.strftime('%H:%M:%S')}")
+
+    def _report(self, message):
+        if self.on_status:
+            self.on_status(message)
@@ -0,0 +1,132 @@
+"""Headless batch rendering of fill sets against a saved library.
+
+Everything here works on generators so a fills file with millions of lines
+is streamed through one line at a time.
+"""
+import json
+import os
+from collections import deque
+from itertools import islice
+
+from .engine import parse_template
+from .storage import open_store
+
+
+class RenderError(ValueError):
+    """A fill set could not be rendered."""
+
+
+def load_library(path):
+    """Load a saved library (JSON or SQLite) as a list of records."""
+    # A mistyped path is an error, not a new empty library (or database)
+    return open_store(path, create=False).load().to_list()
+
+
+def templates_by_title(library):
+    """Map each title in a library to its parsed CompiledTemplate.
+
+    Every template is parsed here, once, so rendering never goes through
+    the engine's bounded cache, however many templates the library has.
+    """
+    return {madlib["title"]: parse_template(madlib["template"]) for madlib in library}
+
+
+def read_fill_lines(file):
+    """Yield (line_number, line) for every non-blank line of a JSONL file."""
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def render_fill_line(templates, line):
+    """Render one JSONL fill set and return the JSON output line.
+
+    ``templates`` maps titles to CompiledTemplates (see templates_by_title).
+    A fill set looks like ``{"title": "Space Adventure", "values": {...}}``
+    and every placeholder of the template must have a value, just like the
+    Play tab requires every field to be filled in.
+    """
+    try:
+        fill = json.loads(line)
+    except ValueError as e:
+        raise RenderError(f"Invalid JSON: {e}")
+    if not isinstance(fill, dict):
+        raise RenderError("Fill set must be a JSON object")
+
+    title = fill.get("title")
+    if not isinstance(title, str):
+        raise RenderError("Fill set must have a string \"title\"")
+    compiled = templates.get(title)
+    if compiled is None:
+        raise RenderError(f"Unknown Mad Lib: {title!r}")
+
+    values = fill.get("values") or {}
+    if not isinstance(values, dict):
+        raise RenderError(f"\"values\" must be a JSON object in {title!r}")
+    for placeholder in compiled.placeholders:
+        if values.get(placeholder) in (None, ""):
+            raise RenderError(f"Missing value for {placeholder!r} in {title!r}")
+
+    story = compiled.render({k: str(v) for k, v in values.items()})
+    return json.dumps({"title": title, "story": story})
+
+
+def render_lines(templates, lines):
+    """Render (line_number, line) pairs.
+
+    Yields (line_number, output_line, error) where exactly one of
+    output_line and error is None.
+    """
+    for line_number, line in lines:
+        try:
+            yield line_number, render_fill_line(templates, line), None
+        except RenderError as e:
+            yield line_number, None, str(e)
+
+
+# Templates for the current worker process, set once by _init_worker
+_worker_templates = None
+
+
+def _init_worker(templates):
+    global _worker_templates
+    _worker_templates = templates
+
+
+def _render_chunk(chunk):
+    return list(render_lines(_worker_templates, chunk))
+
+
+def _chunks(lines, chunk_size):
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_lines_parallel(templates, lines, workers=None, chunk_size=1000):
+    """Like render_lines, but spread over a pool of worker processes.
+
+    The parsed templates are sent to each worker once when it starts. Lines are
+    sent in chunks and results are yielded in input order. Only a few
+    chunks per worker are in flight at a time, so memory stays flat.
+    """
+    # Imported here: multiprocessing is slow to import and only needed for big batches
+    from concurrent.futures import ProcessPoolExecutor
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(templates,)) as executor:
+        pending = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
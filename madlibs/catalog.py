@@ -0,0 +1,135 @@
+"""Cached catalog of the template files in the templates directory."""
+import json
+import os
+
+from . import metrics
+from .engine import compile_template
+
+PREVIEW_LENGTH = 150
+
+
+class TemplateEntry:
+    """One template file and its parsed contents."""
+
+    __slots__ = ("filename", "path", "mtime_ns", "size", "data", "error")
+
+    def __init__(self, filename, path, mtime_ns, size):
+        self.filename = filename
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.data = None
+        self.error = None
+        try:
+            with open(path, "r") as file:
+                self.data = json.load(file)
+            metrics.count("bytes_read", size)
+            # Fail now rather than when the template is used
+            self.data["title"], self.data["template"]
+        except Exception as e:
+            self.data = None
+            self.error = e
+
+    @property
+    def name(self):
+        """Display name derived from the file name"""
+        return os.path.splitext(self.filename)[0].replace('_', ' ').title()
+
+    @property
+    def title(self):
+        return self.data["title"] if self.data else None
+
+    @property
+    def preview(self):
+        if not self.data:
+            return None
+        preview = self.data["template"]
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH] + "..."
+        return preview
+
+    @property
+    def placeholders(self):
+        if not self.data:
+            return set()
+        return set(compile_template(self.data["template"]).placeholders)
+
+    def is_current(self, stat):
+        return stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+
+
+class TemplateCatalog:
+    """Parsed template files, re-read only when they change on disk.
+
+    The directory is only listed again when its own mtime changes (a file
+    was added, removed or renamed). Individual files are checked by mtime
+    and size on every refresh and when they are loaded; a stat is cheap
+    next to parsing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._entries = {}
+        self._dir_mtime_ns = None
+
+    def exists(self):
+        return os.path.isdir(self.directory)
+
+    @metrics.timed("catalog.refresh")
+    def refresh(self):
+        """Pick up added, removed or changed files"""
+        try:
+            dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self._entries = {}
+            self._dir_mtime_ns = None
+            return
+        if dir_mtime_ns == self._dir_mtime_ns and self._revalidate():
+            return
+
+        entries = {}
+        with os.scandir(self.directory) as scan:
+            for dir_entry in scan:
+                if not dir_entry.name.endswith('.json') or not dir_entry.is_file():
+                    continue
+                entries[dir_entry.name] = self._entry(dir_entry.name, dir_entry.path,
+                                                      dir_entry.stat())
+        self._entries = dict(sorted(entries.items()))
+        self._dir_mtime_ns = dir_mtime_ns
+
+    def _revalidate(self):
+        """Re-read entries edited in place, which leaves the directory's
+        mtime alone; returns False if a file has gone missing"""
+        for filename, entry in self._entries.items():
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                return False
+            self._entries[filename] = self._entry(filename, entry.path, stat)
+        return True
+
+    def _entry(self, filename, path, stat):
+        entry = self._entries.get(filename)
+        if entry is None or not entry.is_current(stat):
+            entry = TemplateEntry(filename, path, stat.st_mtime_ns, stat.st_size)
+        return entry
+
+    def entries(self):
+        """Return all template entries, sorted by file name"""
+        self.refresh()
+        return list(self._entries.values())
+
+    def load(self, filename):
+        """Return a copy of a template's data, re-reading it if it changed
+
+        Raises the original error if the file could not be parsed.
+        """
+        path = os.path.join(self.directory, filename)
+        entry = self._entry(filename, path, os.stat(path))
+        self._entries[filename] = entry
+        if entry.error:
+            raise entry.error
+        data = dict(entry.data)
+        if "placeholders" in data:
+            data["placeholders"] = list(data["placeholders"])
+        return data
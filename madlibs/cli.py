@@ -0,0 +1,175 @@
+"""Command line interface for running Mad Libs without the GUI.
+
+Examples:
+    python -m mad_libs_creator render --library madlibs.json --inputs fills.jsonl
+    python -m mad_libs_creator generate --library madlibs.json --prompts prompts.txt
+    python -m mad_libs_creator --profile render.prof render --library madlibs.json
+"""
+import argparse
+import os
+import sys
+
+from . import metrics
+from .batch import (load_library, read_fill_lines, render_lines, render_lines_parallel,
+                    templates_by_title)
+
+
+def _at_least(value, minimum):
+    if value < minimum:
+        raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+    return value
+
+
+def positive_int(text):
+    return _at_least(int(text), 1)
+
+
+def non_negative_int(text):
+    return _at_least(int(text), 0)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="mad_libs_creator",
+                                     description="Headless Mad Libs tools")
+    add_session_options(parser)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser(
+        "render", help="Render one story per line of a JSONL file of fill sets")
+    render.add_argument("--library", required=True,
+                        help="Saved Mad Libs library (madlibs.json or a .db SQLite file)")
+    render.add_argument("--inputs", default="-",
+                        help="JSONL file of fill sets, one per line (default: stdin)")
+    render.add_argument("--output", default="-",
+                        help="Where to write rendered stories as JSONL (default: stdout)")
+    render.add_argument("--workers", type=non_negative_int, default=0,
+                        help="Render in this many worker processes (default: render in-process)")
+    render.add_argument("--chunk-size", type=positive_int, default=1000,
+                        help="Fill sets sent to a worker at a time (default: 1000)")
+    render.set_defaults(func=run_render)
+
+    generate = subparsers.add_parser(
+        "generate", help="Generate AI templates for every prompt in a file")
+    generate.add_argument("--library", required=True,
+                          help="Library to add the generated templates to (madlibs.json or .db)")
+    generate.add_argument("--prompts", required=True,
+                          help="One prompt per line, as text or JSON with prompt/complexity/style")
+    generate.add_argument("--failures",
+                          help="Where to write failed prompts for a retry (default: PROMPTS.failed.jsonl)")
+    generate.add_argument("--complexity", default="Medium",
+                          help="Default complexity for prompts that don't set one")
+    generate.add_argument("--style", default="Funny",
+                          help="Default style for prompts that don't set one")
+    generate.add_argument("--concurrency", type=positive_int, default=4,
+                          help="Requests in flight at once (default: 4)")
+    generate.add_argument("--rpm", type=float, default=60,
+                          help="Requests per minute limit (default: 60)")
+    generate.add_argument("--tpm", type=float, default=40000,
+                          help="Tokens per minute limit (default: 40000)")
+    generate.add_argument("--fresh", action="store_true",
+                          help="Skip cached results and call the API for every prompt")
+    generate.set_defaults(func=run_generate)
+
+    return parser
+
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode)
+
+
+@metrics.timed("cli.render")
+def run_render(args):
+    templates = templates_by_title(load_library(args.library))
+
+    inputs = _open(args.inputs, "r")
+    output = _open(args.output, "w")
+    failures = 0
+    try:
+        lines = read_fill_lines(inputs)
+        if args.workers > 0:
+            results = render_lines_parallel(templates, lines, args.workers, args.chunk_size)
+        else:
+            results = render_lines(templates, lines)
+
+        for line_number, rendered, error in results:
+            if error is not None:
+                failures += 1
+                print(f"line {line_number}: {error}", file=sys.stderr)
+                continue
+            output.write(rendered)
+            output.write("\n")
+    finally:
+        if inputs is not sys.stdin:
+            inputs.close()
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+
+    return 1 if failures else 0
+
+
+def add_session_options(parser):
+    """The --profile and --metrics options, shared with the GUI"""
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the whole run with cProfile and save the stats to FILE")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Save timings and I/O counters to FILE when done "
+                             "(Prometheus text for .prom/.txt, otherwise JSON)")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with metrics.session(args.profile, args.metrics):
+        return args.func(args)
+
+
+def run_generate(args):
+    from . import ai_cache
+    from .ai import AIClient
+    from .ai_batch import RateLimiter, failure_record, iter_batch, read_prompts, unique_title
+    from .storage import open_store
+
+    api_key = os.environ.get("OPENAI_API_KEY", "").strip()
+    if not api_key:
+        print("Set OPENAI_API_KEY to your OpenAI API key.", file=sys.stderr)
+        return 2
+
+    store = open_store(args.library)
+    store.load()
+    client = AIClient(cache=ai_cache.ResponseCache())
+    limiter = RateLimiter(args.rpm, args.tpm)
+    cache_mode = ai_cache.REFRESH if args.fresh else ai_cache.USE
+
+    failures_path = args.failures or args.prompts + ".failed.jsonl"
+    generated = failed = 0
+    with open(args.prompts, "r") as prompts, open(failures_path, "w") as failures:
+        jobs = read_prompts(prompts, args.complexity, args.style)
+        try:
+            for job, template_data, error in iter_batch(client, api_key, jobs, args.concurrency,
+                                                        limiter, cache_mode):
+                if error is not None:
+                    failed += 1
+                    failures.write(failure_record(job, error) + "\n")
+                    failures.flush()
+                    print(f"Failed: {job['prompt'][:60]!r}: {error}", file=sys.stderr)
+                    continue
+                # Save each template as soon as it arrives
+                template_data["title"] = unique_title(store.library, template_data["title"])
+                store.put(template_data)
+                store.flush()
+                generated += 1
+                print(f"Generated: {template_data['title']}", file=sys.stderr)
+        finally:
+            store.flush()
+            store.close()
+            client.close()
+
+    print(f"{generated} generated, {failed} failed", file=sys.stderr)
+    if failed:
+        print(f"Failed prompts were written to {failures_path}", file=sys.stderr)
+    elif os.path.exists(failures_path):
+        os.remove(failures_path)
+    return 1 if failed else 0
@@ -0,0 +1,171 @@
+"""Template parsing and rendering for Mad Libs templates.
+
+A template is parsed once into alternating literal and slot segments so
+rendering is a single pass and a single join, no matter how many
+placeholders the template has.
+"""
+import hashlib
+import re
+
+# Placeholders are words in [brackets], same as the Create tab has always used
+PLACEHOLDER_PATTERN = re.compile(r'\[(.*?)\]')
+
+# Upper bound on the number of compiled templates kept around
+CACHE_SIZE = 4096
+
+_compiled_cache = {}
+
+
+class CompiledTemplate:
+    """A template split into literal text and placeholder slots.
+
+    ``literals`` always has one more item than ``slots``: the rendered story
+    is literals[0] + value(slots[0]) + literals[1] + ... + literals[-1].
+    """
+
+    __slots__ = ("literals", "slots", "placeholders")
+
+    def __init__(self, literals, slots):
+        self.literals = literals
+        self.slots = slots
+        # Unique placeholder names in order of first appearance
+        self.placeholders = list(dict.fromkeys(slots))
+
+    def render(self, values):
+        """Render the template with a mapping of placeholder -> value.
+
+        Placeholders missing from ``values`` are left as ``[placeholder]``.
+        Values are inserted verbatim, so a value that itself contains
+        ``[noun]`` is never substituted again.
+        """
+        literals = self.literals
+        parts = [literals[0]]
+        for i, slot in enumerate(self.slots):
+            value = values.get(slot)
+            parts.append(f"[{slot}]" if value is None else value)
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+
+def parse_template(template):
+    """Parse template text into a new CompiledTemplate (uncached)."""
+    literals = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        literals.append(template[position:match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    literals.append(template[position:])
+    return CompiledTemplate(literals, slots)
+
+
+class PlaceholderScanner:
+    """Find placeholders in text that arrives a piece at a time.
+
+    Each call to feed() only looks at the new text plus any unclosed
+    ``[`` left over from before, so scanning a long stream stays linear.
+    Finds the same placeholders as PLACEHOLDER_PATTERN on the whole text.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.placeholders = []
+        self._seen = set()
+
+    def feed(self, text):
+        """Scan more text and return the placeholders not seen before"""
+        buffer = self.pending + text
+        found = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(buffer):
+            name = match.group(1)
+            if name not in self._seen:
+                self._seen.add(name)
+                found.append(name)
+            position = match.end()
+
+        # Keep the first "[" that could still be closed by a later "]";
+        # placeholders never span lines
+        rest = buffer[position:]
+        start = rest.find("[", rest.rfind("\n") + 1)
+        self.pending = rest[start:] if start >= 0 else ""
+        self.placeholders.extend(found)
+        return found
+
+
+class PlaceholderIndex:
+    """Placeholders of a template that is being edited.
+
+    update() compares the new text with the previous one line by line and
+    only scans the lines that changed, keeping a count of how often each
+    placeholder occurs. Placeholders never span lines, so the result is
+    the same as scanning the whole text.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.line_slots = []  # placeholders on each line, in order
+        self.counts = {}
+
+    def update(self, text):
+        """Take the template's new text; returns True if the placeholders changed"""
+        old_lines = self.lines
+        new_lines = text.split("\n")
+
+        # Lines before and after the edited part are unchanged
+        limit = min(len(old_lines), len(new_lines))
+        start = 0
+        while start < limit and old_lines[start] == new_lines[start]:
+            start += 1
+        end = 0
+        while end < limit - start and old_lines[-1 - end] == new_lines[-1 - end]:
+            end += 1
+        old_end = len(old_lines) - end
+        new_end = len(new_lines) - end
+
+        removed = [slot for slots in self.line_slots[start:old_end] for slot in slots]
+        added = [PLACEHOLDER_PATTERN.findall(line) for line in new_lines[start:new_end]]
+        self.lines = new_lines
+        self.line_slots[start:old_end] = added
+
+        counts = self.counts
+        for slot in removed:
+            counts[slot] -= 1
+            if not counts[slot]:
+                del counts[slot]
+        for slots in added:
+            for slot in slots:
+                counts[slot] = counts.get(slot, 0) + 1
+        return bool(removed) or any(added)
+
+    def placeholders(self):
+        """Unique placeholders in order of first appearance"""
+        return list(dict.fromkeys(slot for slots in self.line_slots for slot in slots))
+
+    def total(self):
+        """Number of placeholder slots in the template"""
+        return sum(self.counts.values())
+
+
+def template_key(template):
+    """Return the cache key for a template's text."""
+    return hashlib.blake2b(template.encode("utf-8"), digest_size=16).digest()
+
+
+def compile_template(template):
+    """Return the CompiledTemplate for ``template``, parsing it at most once."""
+    key = template_key(template)
+    compiled = _compiled_cache.get(key)
+    if compiled is None:
+        compiled = parse_template(template)
+        if len(_compiled_cache) >= CACHE_SIZE:
+            # Drop the oldest entry; dicts keep insertion order
+            del _compiled_cache[next(iter(_compiled_cache))]
+        _compiled_cache[key] = compiled
+    return compiled
+
+
+def render_template(template, values):
+    """Render template text with a mapping of placeholder -> value."""
+    return compile_template(template).render(values)
@@ -0,0 +1,140 @@
+"""The example templates offered by "Try Examples" in the Play tab."""
+import json
+import os
+
+EXAMPLE_TEMPLATES = [
+    # Original 5 templates
+    {
+        "filename": "space_adventure.json",
+        "data": {
+            "title": "Space Adventure",
+            "template": "Captain [name] embarked on a journey to the [adjective] planet [planet_name]. The ship's [noun] malfunctioned as they [verb_past] through an asteroid field. \"[exclamation]!\" shouted the captain, \"We need to [verb] immediately!\" The alien crew members began to [verb] frantically. Eventually, they landed on a [adjective] moon where [plural_noun] roamed freely. It was the most [adjective] adventure in the history of space exploration.",
+            "placeholders": ["name", "adjective", "planet_name", "noun", "verb_past", "exclamation", "verb", "verb", "adjective", "plural_noun", "adjective"]
+        }
+    },
+    {
+        "filename": "fairy_tale.json",
+        "data": {
+            "title": "Once Upon a Time",
+            "template": "Once upon a time, in a [adjective] kingdom, there lived a [noun] named [name]. Every day, they would [verb] by the [adjective] [place]. One day, a [adjective] [magical_creature] appeared and granted them three [plural_noun]. \"[exclamation]!\" they shouted with joy. With their new [plural_noun], [name] decided to [verb] the evil [villain]. After a [adjective] battle, they lived [adverb] ever after.",
+            "placeholders": ["adjective", "noun", "name", "verb", "adjective", "place", "adjective", "magical_creature", "plural_noun", "exclamation", "plural_noun", "name", "verb", "villain", "adjective", "adverb"]
+        }
+    },
+    {
+        "filename": "cooking_disaster.json",
+        "data": {
+            "title": "Kitchen Catastrophe",
+            "template": "Today I decided to cook a [adjective] meal for my [relative]. I started by [verb_ending_in_ing] [number] [plural_food] in a [adjective] pan. I accidentally added too much [substance], which made everything smell like [smelly_item]. \"[exclamation]!\" I shouted as the mixture began to [verb]. I tried to fix it by adding a [adjective] [food_item], but that only made it [verb]. In the end, we just ordered [type_of_cuisine] food and [verb_past] while watching [TV_show].",
+            "placeholders": ["adjective", "relative", "verb_ending_in_ing", "number", "plural_food", "adjective", "substance", "smelly_item", "exclamation", "verb", "adjective", "food_item", "verb", "type_of_cuisine", "verb_past", "TV_show"]
+        }
+    },
+    {
+        "filename": "superhero_origin.json",
+        "data": {
+            "title": "Birth of a Hero",
+            "template": "By day, [name] was just an ordinary [occupation], but at night, they became [superhero_name], the most [adjective] superhero in [city_name]! Their superpowers included [verb_ending_in_ing] [adverb] and shooting [plural_noun] from their [body_part]. Their arch-nemesis, [villain_name], was always plotting to [verb] the city's supply of [plural_noun]. With the help of their sidekick, [animal], [superhero_name] always saved the day by using their [adjective] [noun] to [verb] the day!",
+            "placeholders": ["name", "occupation", "superhero_name", "adjective", "city_name", "verb_ending_in_ing", "adverb", "plural_noun", "body_part", "villain_name", "verb", "plural_noun", "animal", "superhero_name", "adjective", "noun", "verb"]
+        }
+    },
+    {
+        "filename": "vacation_disaster.json",
+        "data": {
+            "title": "Vacation Disaster",
+            "template": "Last summer, my family decided to go on a [adjective] vacation to [place]. We packed our [plural_noun] and headed off in our [adjective] [vehicle]. After [number] hours of traveling, we realized we had forgotten our [important_item]! \"[exclamation]!\" my [family_member] screamed. We stopped at a [adjective] store to buy a new one, but they only had [adjective] ones. The hotel was even worse! The room was full of [plural_noun] and the [room_item] was [verb_ending_in_ing]. We ended up [verb_ending_in_ing] at a nearby [place] instead, which turned out to be the most [adjective] part of our trip.",
+            "placeholders": ["adjective", "place", "plural_noun", "adjective", "vehicle", "number", "important_item", "exclamation", "family_member", "adjective", "adjective", "plural_noun", "room_item", "verb_ending_in_ing", "verb_ending_in_ing", "place", "adjective"]
+        }
+    },
+
+    # 10 new templates
+    {
+        "filename": "haunted_house.json",
+        "data": {
+            "title": "The Haunted House",
+            "template": "Last night, I decided to explore the [adjective] haunted house on [street_name] Street. I brought my trusty [noun] for protection. As I approached the [adjective] door, I heard a [sound] coming from inside. \"[exclamation]!\" I whispered. I slowly turned the [adjective] doorknob and entered. The floor was covered in [plural_noun] and the walls were dripping with [substance]. Suddenly, a [adjective] [monster] jumped out and started [verb_ending_in_ing] around the room. I tried to [verb], but my legs wouldn't move. The ghost whispered, \"[silly_phrase]\" and then disappeared in a puff of [color] smoke. I'll never go [verb_ending_in_ing] in a haunted house again!",
+            "placeholders": ["adjective", "street_name", "noun", "adjective", "sound", "exclamation", "adjective", "plural_noun", "substance", "adjective", "monster", "verb_ending_in_ing", "verb", "silly_phrase", "color", "verb_ending_in_ing"]
+        }
+    },
+    {
+        "filename": "job_interview.json",
+        "data": {
+            "title": "My Disastrous Job Interview",
+            "template": "I was so [adjective] about my job interview at [company_name]. I put on my most [adjective] [clothing_item] and practiced answering questions in front of my [noun]. When I arrived, the receptionist asked me to [verb] in the waiting room. After [number] minutes, a [adjective] person named [name] called me into their office. The interview started well until they asked me why I wanted to [verb] for their company. I accidentally said, \"Because I'm really good at [verb_ending_in_ing] [plural_noun]!\" The interviewer looked [adjective] and then asked about my greatest weakness. I blurted out, \"[food]!\" Before I knew it, I was [verb_ending_in_ing] out the door. I guess I won't be [verb_ending_in_ing] there anytime soon!",
+            "placeholders": ["adjective", "company_name", "adjective", "clothing_item", "noun", "verb", "number", "adjective", "name", "verb", "verb_ending_in_ing", "plural_noun", "adjective", "food", "verb_ending_in_ing", "verb_ending_in_ing"]
+        }
+    },
+    {
+        "filename": "alien_encounter.json",
+        "data": {
+            "title": "Close Encounter",
+            "template": "I was [verb_ending_in_ing] in my backyard when a [adjective] light appeared in the sky. A [color] spacecraft landed on my [noun]. The door opened with a [sound], and [number] aliens with [body_part_plural] on their heads stepped out. \"[greeting]!\" their leader said in a [adjective] voice. \"We come from the planet [made_up_word] and need your [plural_noun] to save our civilization!\" I was so [emotion] that I could only [verb]. They offered me a [adjective] [food] as a gift. Before leaving, they [adverb] promised to return next [day_of_week]. Now I keep a [noun] ready just in case they come back for more [plural_noun].",
+            "placeholders": ["verb_ending_in_ing", "adjective", "color", "noun", "sound", "number", "body_part_plural", "greeting", "adjective", "made_up_word", "plural_noun", "emotion", "verb", "adjective", "food", "adverb", "day_of_week", "noun", "plural_noun"]
+        }
+    },
+    {
+        "filename": "first_date.json",
+        "data": {
+            "title": "First Date Fiasco",
+            "template": "I was so [adjective] about my first date with [name]. I decided to wear my favorite [color] [clothing_item] and meet them at a [adjective] restaurant called [restaurant_name]. When I arrived, I accidentally tripped over a [noun] and [verb_past] right into the [noun]. [name] was already sitting at our table, looking [adjective] in their [clothing_item]. I tried to act [adverb], but when I went to [verb] my chair, I [verb_past] instead. The waiter came over and I nervously ordered [food] with extra [food_ingredient]. During our conversation, I mentioned my love for [verb_ending_in_ing] [plural_noun], which made [name] look at me [adverb]. By the end of the night, I had [verb_past] my [body_part] and spilled [beverage] all over the table. Surprisingly, [name] still wants to [verb] again next [day_of_week]!",
+            "placeholders": ["adjective", "name", "color", "clothing_item", "adjective", "restaurant_name", "noun", "verb_past", "noun", "name", "adjective", "clothing_item", "adverb", "verb", "verb_past", "food", "food_ingredient", "verb_ending_in_ing", "plural_noun", "name", "adverb", "verb_past", "body_part", "beverage", "name", "verb", "day_of_week"]
+        }
+    },
+    {
+        "filename": "sports_commentary.json",
+        "data": {
+            "title": "Sports Commentary",
+            "template": "Welcome to the championship [sport] game between the [city] [plural_animal] and the [city] [plural_noun]! The [plural_animal]'s star player, [name], is known for their ability to [verb] [adverb]. The crowd is [verb_ending_in_ing] as the game begins! Oh my! [name] just [verb_past] the [noun] across the entire [place]! The coach is [verb_ending_in_ing] on the sidelines. Wait - a [adjective] [animal] has run onto the field! Security is trying to [verb] it, but it's too [adjective]! Meanwhile, the [plural_noun] are attempting their famous \"[silly_phrase]\" play. The referee throws a [color] flag and calls a penalty for illegal [verb_ending_in_ing]. With only [number] seconds left, [name] makes the winning move by [verb_ending_in_ing] over three defenders! The [plural_animal] win the [adjective] trophy, and the celebration is absolutely [adjective]!",
+            "placeholders": ["sport", "city", "plural_animal", "city", "plural_noun", "plural_animal", "name", "verb", "adverb", "verb_ending_in_ing", "name", "verb_past", "noun", "place", "verb_ending_in_ing", "adjective", "animal", "verb", "adjective", "plural_noun", "silly_phrase", "color", "verb_ending_in_ing", "number", "name", "verb_ending_in_ing", "plural_animal", "adjective", "adjective"]
+        }
+    },
+    {
+        "filename": "weather_report.json",
+        "data": {
+            "title": "Unusual Weather Report",
+            "template": "Good evening, I'm [name] with your [adjective] weather forecast. Today, we experienced [adjective] temperatures reaching [number] degrees, causing [plural_noun] to [verb] spontaneously! Tomorrow, a front of [adjective] air will move in from the [direction], bringing a 70% chance of falling [plural_noun]. Residents in [city_name] should prepare by [verb_ending_in_ing] their [plural_noun] and keeping a [noun] handy. The [body_of_water] is expected to turn [color] and begin [verb_ending_in_ing] due to the unusual atmospheric [noun]. Weather experts are [verb_ending_in_ing] in confusion. By [day_of_week], we expect [animal_plural] to rain from the sky, so don't forget your [adjective] umbrella! This has been [name] with your [adjective] weather report. Back to you in the studio!",
+            "placeholders": ["name", "adjective", "adjective", "number", "plural_noun", "verb", "adjective", "direction", "plural_noun", "city_name", "verb_ending_in_ing", "plural_noun", "noun", "body_of_water", "color", "verb_ending_in_ing", "noun", "verb_ending_in_ing", "day_of_week", "animal_plural", "adjective", "name", "adjective"]
+        }
+    },
+    {
+        "filename": "video_game.json",
+        "data": {
+            "title": "Epic Video Game Adventure",
+            "template": "In the [adjective] video game \"[made_up_title]\", you play as a heroic [occupation] named [character_name] who must save the kingdom of [made_up_place]. Your character can [verb] up to [number] feet and has a special ability to [verb] [plural_noun] with their magical [noun]. The main villain, the evil [title] [villain_name], has stolen all the [plural_noun] and hidden them in a [adjective] castle guarded by [number] [adjective] [creature_plural]. Along your journey, you'll meet a [adjective] sidekick who helps you by [verb_ending_in_ing] [adverb]. The most challenging level is the [place] of [emotion], where you must [verb] across [substance] while avoiding flying [plural_noun]. If you collect enough [color] coins, you can unlock the secret [clothing_item] that makes you [verb] twice as fast! The final boss battle involves [verb_ending_in_ing] the villain until they [verb] and turn into a giant [animal].",
+            "placeholders": ["adjective", "made_up_title", "occupation", "character_name", "made_up_place", "verb", "number", "verb", "plural_noun", "noun", "title", "villain_name", "plural_noun", "adjective", "number", "adjective", "creature_plural", "adjective", "verb_ending_in_ing", "adverb", "place", "emotion", "verb", "substance", "plural_noun", "color", "clothing_item", "verb", "verb_ending_in_ing", "verb", "animal"]
+        }
+    },
+    {
+        "filename": "restaurant_review.json",
+        "data": {
+            "title": "Restaurant Critic",
+            "template": "I recently visited the new [nationality] restaurant called \"[restaurant_name]\" on [street_name] Street. The atmosphere was [adjective] with [plural_noun] hanging from the ceiling and [adjective] music playing in the background. My server, who introduced themselves as [name], was extremely [adjective] and recommended their signature dish: [food] with [adjective] [food_ingredient] sauce. When the appetizer arrived, it looked like a [noun] that had been [verb_past] for [number] hours. I cautiously took a [adjective] bite and my taste buds began [verb_ending_in_ing] immediately! For the main course, I ordered the [animal] [body_part] served on a bed of [color] [plural_vegetable]. The chef clearly enjoys [verb_ending_in_ing] too much [substance] into everything. The dessert, however, was [adverb] [adjective] – a [adjective] [dessert] topped with [plural_noun]. I give this restaurant [number] out of 5 stars, and would recommend it to anyone who enjoys [verb_ending_in_ing] while they eat.",
+            "placeholders": ["nationality", "restaurant_name", "street_name", "adjective", "plural_noun", "adjective", "name", "adjective", "food", "adjective", "food_ingredient", "noun", "verb_past", "number", "adjective", "verb_ending_in_ing", "animal", "body_part", "color", "plural_vegetable", "verb_ending_in_ing", "substance", "adverb", "adjective", "adjective", "dessert", "plural_noun", "number", "verb_ending_in_ing"]
+        }
+    },
+    {
+        "filename": "love_letter.json",
+        "data": {
+            "title": "Ridiculous Love Letter",
+            "template": "My [adjective] [term_of_endearment],\n\nEver since I [verb_past] you at the [place], I haven't been able to stop [verb_ending_in_ing] about you. Your [body_part_plural] are like [plural_noun], and your [adjective] smile makes my [body_part] [verb] with joy. You are more [adjective] than a [noun] full of [plural_noun].\n\nWhen you [verb], it sounds like a [animal] [verb_ending_in_ing] in a field of [plural_flower]. I want to [verb] with you under the [celestial_body] and whisper [adjective] nothings into your [body_part].\n\nYesterday, I wrote a [adjective] poem about your [body_part], but my [animal] ate it. I've enclosed a [adjective] [noun] to show my affection. Please [verb] me soon, as I'm [adverb] [verb_ending_in_ing] for your reply.\n\n[adverb] yours,\n[silly_name]",
+            "placeholders": ["adjective", "term_of_endearment", "verb_past", "place", "verb_ending_in_ing", "body_part_plural", "plural_noun", "adjective", "body_part", "verb", "adjective", "noun", "plural_noun", "verb", "animal", "verb_ending_in_ing", "plural_flower", "verb", "celestial_body", "adjective", "body_part", "adjective", "body_part", "animal", "adjective", "noun", "verb", "adverb", "verb_ending_in_ing", "adverb", "silly_name"]
+        }
+    },
+    {
+        "filename": "tech_support.json",
+        "data": {
+            "title": "Tech Support Nightmare",
+            "template": "Hello, thank you for calling [company_name] tech support. My name is [name], how may I [verb] you today? Your computer is doing WHAT with [plural_noun]? Have you tried [verb_ending_in_ing] it off and on again? OK, let's try something else. First, [verb] your [computer_part] and count to [number] [adverb]. Now, press the [color] button while [verb_ending_in_ing] the [noun]. Do you see a message about [plural_animal] on your screen? That's [adjective]! Next, try [verb_ending_in_ing] into the [adjective] drive. What's that? Your [noun] is now [verb_ending_in_ing] and making a sound like a [animal] [verb_ending_in_ing] underwater? Please [verb] your [software_name] and delete any files that look like [plural_noun]. Still not working? I'll need to transfer you to our [adjective] specialist who deals with [adjective] [plural_noun]. Please hold while I [verb] your call. *[adverb] plays [genre] music*",
+            "placeholders": ["company_name", "name", "verb", "plural_noun", "verb_ending_in_ing", "verb", "computer_part", "number", "adverb", "color", "verb_ending_in_ing", "noun", "plural_animal", "adjective", "verb_ending_in_ing", "adjective", "noun", "verb_ending_in_ing", "animal", "verb_ending_in_ing", "verb", "software_name", "plural_noun", "adjective", "adjective", "plural_noun", "verb", "adverb", "genre"]
+        }
+    }
+]
+
+
+def write_example_templates(directory):
+    """Write each example template to ``directory`` unless a file is already there"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    for template in EXAMPLE_TEMPLATES:
+        filepath = os.path.join(directory, template["filename"])
+        if not os.path.exists(filepath):
+            with open(filepath, "w") as file:
+                json.dump(template["data"], file, indent=2)
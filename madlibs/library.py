@@ -0,0 +1,207 @@
+"""In-memory Mad Libs library indexed by title."""
+import threading
+
+from . import metrics
+from .records import MadLibRecord
+from .search import WORD_PATTERN, SearchIndex, parse_query
+
+
+class MadLibsLibrary:
+    """Ordered collection of Mad Lib records keyed by title.
+
+    Records live in a dict keyed by title, so lookup, insert, update and
+    delete are O(1) and iteration keeps insertion order. Positional access
+    (used by the list views) goes through a list of titles that is built
+    on demand and kept up to date on append.
+
+    Records are stored as compact MadLibRecords, which read like the
+    dicts saved in madlibs.json.
+
+    A ``searchable`` library also keeps a SearchIndex for fast search();
+    otherwise search() scans. The index is built by the first search, or
+    ahead of time by build_search_index(), possibly on another thread;
+    from then on it is kept up to date with every change.
+    """
+
+    def __init__(self, records=(), searchable=False):
+        self._records = {}
+        self._titles = []
+        self._positions = None
+        self._searchable = searchable
+        self._search_index = None
+        # Changes made while the index is built on another thread, applied
+        # to it once it is done; None when no build is running
+        self._index_backlog = None
+        self._index_lock = threading.Lock()
+        for record in records:
+            self.put(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def searchable(self):
+        return self._searchable
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __contains__(self, title):
+        return title in self._records
+
+    def __getitem__(self, index):
+        return self._records[self.titles()[index]]
+
+    def get(self, title, default=None):
+        return self._records.get(title, default)
+
+    def put(self, record):
+        """Insert or replace the record with the same title.
+
+        Returns True if the title is new. An updated record keeps its
+        position.
+        """
+        record = MadLibRecord.from_dict(record)
+        title = record.title
+        is_new = title not in self._records
+        self._records[title] = record
+        if is_new and self._titles is not None:
+            if self._positions is not None:
+                self._positions[title] = len(self._titles)
+            self._titles.append(title)
+        if self._searchable:
+            self._update_search_index(record=record)
+        return is_new
+
+    def remove(self, title):
+        """Remove and return the record with ``title``, or None."""
+        record = self._records.pop(title, None)
+        if record is not None:
+            # Rebuilt lazily the next time positions are needed
+            self._titles = None
+            self._positions = None
+            if self._searchable:
+                self._update_search_index(title=title)
+        return record
+
+    def _update_search_index(self, record=None, title=None):
+        with self._index_lock:
+            if self._index_backlog is not None:
+                self._index_backlog.append((record, title))
+                return
+            index = self._search_index
+            if index is None:
+                return
+            if record is not None:
+                index.add(record)
+            else:
+                index.remove(title)
+            if index.needs_compaction():
+                index.rebuild(self._records.values())
+
+    @property
+    def search_ready(self):
+        """False while the search index is being built on another thread"""
+        return self._index_backlog is None
+
+    def build_search_index(self, background=False):
+        """Build the search index now, unless it is built or being built.
+
+        With ``background``, the records are indexed on a new daemon
+        thread, which is returned; search() scans until it is done, and
+        changes made meanwhile are applied to the index at the end. Call
+        this from the thread that changes the library.
+        """
+        if not self._searchable:
+            raise ValueError("The library is not searchable")
+        with self._index_lock:
+            if self._search_index is not None or self._index_backlog is not None:
+                return None
+            self._index_backlog = []
+            records = list(self._records.values())
+        if not background:
+            self._finish_search_index(records)
+            return None
+        thread = threading.Thread(target=self._finish_search_index, args=(records,),
+                                  name="madlibs-search-index", daemon=True)
+        thread.start()
+        return thread
+
+    @metrics.timed("library.build_search_index")
+    def _finish_search_index(self, records):
+        # Records are immutable, so they can be indexed on any thread
+        index = SearchIndex(records)
+        with self._index_lock:
+            for record, title in self._index_backlog:
+                if record is not None:
+                    index.add(record)
+                else:
+                    index.remove(title)
+            self._search_index = index
+            self._index_backlog = None
+
+    def titles(self):
+        """Return the list of titles in library order (do not modify)."""
+        if self._titles is None:
+            self._titles = list(self._records)
+        return self._titles
+
+    def index(self, title):
+        """Return the position of ``title`` in library order."""
+        if self._positions is None:
+            self._positions = {t: i for i, t in enumerate(self.titles())}
+        return self._positions[title]
+
+    def to_list(self):
+        """Return the records as a plain list, in the order of madlibs.json."""
+        return list(self._records.values())
+
+    @metrics.timed("library.search")
+    def search(self, text, limit=200):
+        """Return up to ``limit`` titles matching a search, best first.
+
+        Searchable libraries use their SearchIndex, building it first if
+        need be. Otherwise (or while the index is being built on another
+        thread) every record is scanned, and a word found in the title
+        counts more than one only found in the template.
+        """
+        if self._searchable:
+            self.build_search_index()
+            if self._search_index is not None:
+                return self._search_index.search(text, limit)
+        words, placeholders = parse_query(text)
+        if not words and not placeholders:
+            return []
+        scored = []
+        for position, record in enumerate(self._records.values()):
+            if placeholders and not set(placeholders).issubset(record["placeholders"]):
+                continue
+            title_words = WORD_PATTERN.findall(record["title"].lower())
+            template_words = None
+            score = 0
+            for word in words:
+                if any(w.startswith(word) for w in title_words):
+                    score += 2
+                    continue
+                if template_words is None:
+                    template_words = WORD_PATTERN.findall(record["template"].lower())
+                if not any(w.startswith(word) for w in template_words):
+                    break
+                score += 1
+            else:
+                scored.append((-score, position, record["title"]))
+        scored.sort()
+        return [title for _, _, title in scored[:limit]]
+
+
+class TitleView:
+    """Live, read-only sequence of a library's titles, for list views."""
+
+    def __init__(self, library):
+        self.library = library
+
+    def __len__(self):
+        return len(self.library)
+
+    def __getitem__(self, index):
+        return self.library.titles()[index]
@@ -0,0 +1,182 @@
+"""Lightweight timing spans and counters for finding out where time goes.
+
+Metrics are off by default. While off, span() returns a shared no-op
+context manager and timed(), observe() and count() return after a single
+flag check, so leaving the instrumentation in hot paths costs next to
+nothing. Turn them on with enable() (the --metrics option) and write
+them out with export() as JSON or Prometheus text.
+"""
+import functools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+_enabled = False
+_lock = threading.Lock()
+_timings = {}   # span name -> [count, total seconds, max seconds]
+_counters = {}  # counter name -> value
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def observe(name, seconds):
+    """Record one timing for span ``name``"""
+    if not _enabled:
+        return
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            _timings[name] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+
+def count(name, amount=1):
+    """Add ``amount`` to counter ``name``"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager that times the block as span ``name``"""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator that times every call of the function as span ``name``"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """All metrics recorded so far, as plain JSON-ready data"""
+    with _lock:
+        return {
+            "spans": {name: {"count": c, "total_seconds": total, "max_seconds": peak}
+                      for name, (c, total, peak) in sorted(_timings.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def prometheus_text():
+    """The metrics in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        "# HELP madlibs_span_seconds Time spent in instrumented operations.",
+        "# TYPE madlibs_span_seconds summary",
+    ]
+    for name, timing in data["spans"].items():
+        lines.append(f'madlibs_span_seconds_count{{span="{name}"}} {timing["count"]}')
+        lines.append(f'madlibs_span_seconds_sum{{span="{name}"}} {timing["total_seconds"]:.9f}')
+    lines.append("# HELP madlibs_span_seconds_max Longest single call of each operation.")
+    lines.append("# TYPE madlibs_span_seconds_max gauge")
+    for name, timing in data["spans"].items():
+        lines.append(f'madlibs_span_seconds_max{{span="{name}"}} {timing["max_seconds"]:.9f}')
+    for name, value in data["counters"].items():
+        metric = f"madlibs_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """Write the metrics to ``path``: Prometheus text for .prom/.txt, otherwise JSON"""
+    if path.endswith((".prom", ".txt")):
+        with open(path, "w") as file:
+            file.write(prometheus_text())
+    else:
+        with open(path, "w") as file:
+            json.dump(snapshot(), file, indent=2)
+
+
+@contextmanager
+def session(profile_path=None, metrics_path=None):
+    """Run a block with optional cProfile profiling and metrics export.
+
+    The profile is written to ``profile_path`` (readable with pstats or
+    snakeviz) and the metrics to ``metrics_path`` when the block ends,
+    even if it raises.
+    """
+    if metrics_path:
+        enable()
+    profiler = None
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if metrics_path:
+            export(metrics_path)
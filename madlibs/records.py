@@ -0,0 +1,153 @@
+"""Compact in-memory representation of saved Mad Libs.
+
+A record loaded from JSON is a dict holding a list of placeholder
+strings, and every occurrence of "noun" or "adjective" in a library is
+a separate string object. MadLibRecord uses ``__slots__`` instead of a
+dict and numbers placeholder names through a shared
+PlaceholderVocabulary: the placeholder list becomes an array of small
+integers, and so do the template's slots, whose names are cut out of
+the stored text ("a [noun] ran" is kept as "a [] ran" plus one id).
+
+It is a read-only Mapping, so code written for the plain dicts
+(``record["template"]``, ``record.get(...)``, ``dict(record)``) keeps
+working; copy() returns a plain dict that can be edited.
+"""
+import threading
+from array import array
+from collections.abc import Mapping
+
+from .engine import PLACEHOLDER_PATTERN
+
+FIELDS = ("title", "template", "placeholders")
+
+# What a placeholder leaves behind in the stored template text
+_EMPTY_SLOT = "[]"
+
+
+class PlaceholderVocabulary:
+    """Numbers placeholder names so each distinct name is stored once."""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def encode(self, names):
+        """Return the names as an array of ids, adding new names"""
+        ids = self._ids
+        try:
+            encoded = [ids[name] for name in names]
+        except KeyError:
+            with self._lock:
+                for name in names:
+                    if name not in ids:
+                        ids[name] = len(self._names)
+                        self._names.append(name)
+            encoded = [ids[name] for name in names]
+        # Two bytes per placeholder until there are more than 65536 names
+        return array("H" if len(self._names) <= 0x10000 else "I", encoded)
+
+    def decode(self, encoded):
+        names = self._names
+        return [names[i] for i in encoded]
+
+
+# Shared by every record, so a name is stored once per process
+PLACEHOLDERS = PlaceholderVocabulary()
+
+
+class MadLibRecord(Mapping):
+    """A saved Mad Lib with interned placeholders; reads like the dict."""
+
+    __slots__ = ("title", "_text", "_slots", "_placeholders", "_extra")
+
+    def __init__(self, title, template, placeholders, extra=None):
+        self.title = title
+        # One pass: split() alternates literal text and placeholder names
+        pieces = PLACEHOLDER_PATTERN.split(template)
+        slots = pieces[1::2]
+        text = _EMPTY_SLOT.join(pieces[::2])
+        # Literal "[]" is itself a placeholder, so every "[]" left in the
+        # text is an emptied slot; only a newline inside a would-be
+        # placeholder can break that, and such templates are kept whole
+        if text.count(_EMPTY_SLOT) == len(slots):
+            self._text = text
+            self._slots = PLACEHOLDERS.encode(slots)
+        else:
+            self._text = template
+            self._slots = None
+        placeholders = list(placeholders)
+        # Usually the same list as the slots, and then stored only once
+        if self._slots is not None and placeholders == slots:
+            self._placeholders = self._slots
+        else:
+            self._placeholders = PLACEHOLDERS.encode(placeholders)
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dict with title, template and placeholders.
+
+        Any other keys are kept as they are.
+        """
+        if isinstance(data, cls):
+            return data
+        extra = {key: value for key, value in data.items() if key not in FIELDS}
+        return cls(data["title"], data["template"], data["placeholders"], extra)
+
+    @property
+    def template(self):
+        """The template text, with the placeholder names put back"""
+        if not self._slots:
+            return self._text
+        parts = self._text.split(_EMPTY_SLOT)
+        names = PLACEHOLDERS.decode(self._slots)
+        pieces = [parts[0]]
+        for name, part in zip(names, parts[1:]):
+            pieces.append(f"[{name}]")
+            pieces.append(part)
+        return "".join(pieces)
+
+    @property
+    def placeholders(self):
+        """The placeholder names as a new list"""
+        return PLACEHOLDERS.decode(self._placeholders)
+
+    def __getitem__(self, key):
+        if key == "title":
+            return self.title
+        if key == "template":
+            return self.template
+        if key == "placeholders":
+            return self.placeholders
+        if self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from FIELDS
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return len(FIELDS) + (len(self._extra) if self._extra is not None else 0)
+
+    def copy(self):
+        """Return the record as a new plain dict"""
+        return dict(self)
+
+    def __reduce__(self):
+        return (self.__class__.from_dict, (self.copy(),))
+
+    def __repr__(self):
+        return f"MadLibRecord({self.copy()!r})"
+
+
+def to_json(value):
+    """``default`` for json.dump, which does not know about MadLibRecord"""
+    if isinstance(value, MadLibRecord):
+        return value.copy()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
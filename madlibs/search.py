@@ -0,0 +1,238 @@
+"""Incremental in-memory search index for a Mad Libs library.
+
+An inverted index maps every word of a title or template, and every
+placeholder name, to the documents it occurs in. Each indexed record is
+a document with a number. A rare word keeps its documents as an array
+of numbers; once a word is in more than one document in 32, a bitmap
+(one bit per document) is smaller, and the word switches to that.
+Queries turn everything into Python ints used as bitsets, so unions
+and intersections run as C bit operations whatever the library size.
+
+Words are kept in a sorted list, so a prefix is a bisect away from all
+the words it starts. Very short prefixes would have to merge the
+postings of a large part of the vocabulary, so every two-letter prefix
+has postings of its own, and a one-letter prefix merges just those.
+
+Changes are incremental: add() appends a new document, remove() only
+clears its bit in the set of live documents. An updated record is
+removed and added again under a new number. Once dead documents
+outnumber live ones, the owner should rebuild() the index.
+"""
+import bisect
+import re
+from array import array
+
+from .engine import PLACEHOLDER_PATTERN
+
+WORD_PATTERN = re.compile(r'\w+')
+
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+# Prefixes of this length have postings of their own; shorter ones are
+# answered from those
+SHORT_PREFIX = 2
+
+# Never bother compacting an index with fewer dead documents than this
+COMPACT_MIN_DEAD = 1000
+
+
+def parse_query(text):
+    """Split a search into lowercase words and ``[placeholder]`` terms.
+
+    Words match as prefixes of the words in a title or template; every
+    placeholder term must be one of the template's placeholders.
+    """
+    placeholders = PLACEHOLDER_PATTERN.findall(text)
+    words = WORD_PATTERN.findall(PLACEHOLDER_PATTERN.sub(" ", text).lower())
+    return words, placeholders
+
+
+def _grow(bits, byte):
+    # Grow geometrically so appending documents stays cheap
+    bits.extend(bytes(max(byte + 1 - len(bits), len(bits))))
+
+
+def _set_bit(bits, index):
+    byte = index >> 3
+    if byte >= len(bits):
+        _grow(bits, byte)
+    bits[byte] |= 1 << (index & 7)
+
+
+def _to_bitmap(ids):
+    bits = bytearray((ids[-1] >> 3) + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return bits
+
+
+def _add_document(table, keys, doc_id):
+    """Add a document to the postings of ``keys``; returns the keys that were new.
+
+    Postings are an array of document numbers while that is smaller than
+    a bitmap, and a bytearray with one bit per document after that.
+    """
+    byte = doc_id >> 3
+    mask = 1 << (doc_id & 7)
+    # An array entry takes 32 bits, a bitmap one bit per document
+    max_ids = (doc_id + 1024) >> 5
+    new_keys = []
+    get = table.get
+    for key in keys:
+        postings = get(key)
+        if postings is None:
+            table[key] = array("i", (doc_id,))
+            new_keys.append(key)
+        elif type(postings) is bytearray:
+            if byte >= len(postings):
+                _grow(postings, byte)
+            postings[byte] |= mask
+        else:
+            postings.append(doc_id)
+            if len(postings) > max_ids:
+                table[key] = _to_bitmap(postings)
+    return new_keys
+
+
+def _bitset(postings):
+    """Postings as an int with one bit set per document"""
+    if postings is None:
+        return 0
+    if type(postings) is not bytearray:
+        postings = _to_bitmap(postings)
+    return int.from_bytes(postings, "little")
+
+
+def _first_ids(bits, limit):
+    """The lowest ``limit`` set bits of an int, in increasing order"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    ids = []
+    # The regex engine skips runs of empty bytes at C speed
+    for match in _NONZERO_BYTE.finditer(data):
+        byte = data[match.start()]
+        base = match.start() * 8
+        for bit in range(8):
+            if byte >> bit & 1:
+                ids.append(base + bit)
+        if len(ids) >= limit:
+            return ids[:limit]
+    return ids
+
+
+class _Field:
+    """Postings for one part of a record (title or template text)"""
+
+    def __init__(self):
+        self.terms = []  # sorted, for prefix lookups
+        self.postings = {}
+        self.prefixes = {}
+
+    def add(self, doc_id, words):
+        for word in _add_document(self.postings, words, doc_id):
+            bisect.insort(self.terms, word)
+        _add_document(self.prefixes, {word[:SHORT_PREFIX] for word in words}, doc_id)
+
+    def matching(self, prefix):
+        """Bitset of the documents with a word starting with ``prefix``"""
+        if len(prefix) == SHORT_PREFIX:
+            return _bitset(self.prefixes.get(prefix))
+        bits = 0
+        if len(prefix) < SHORT_PREFIX:
+            for key, postings in self.prefixes.items():
+                if key.startswith(prefix):
+                    bits |= _bitset(postings)
+            return bits
+        start = bisect.bisect_left(self.terms, prefix)
+        for term in self.terms[start:]:
+            if not term.startswith(prefix):
+                break
+            bits |= _bitset(self.postings[term])
+        return bits
+
+
+class SearchIndex:
+    """Inverted index over titles, template words and placeholder names."""
+
+    def __init__(self, records=()):
+        self._clear()
+        for record in records:
+            self.add(record)
+
+    def _clear(self):
+        self._titles = _Field()
+        self._text = _Field()
+        self._placeholders = {}
+        self._doc_titles = []  # document number -> title, None once removed
+        self._doc_of = {}      # title -> live document number
+        self._live = bytearray()
+
+    def __len__(self):
+        return len(self._doc_of)
+
+    @property
+    def dead(self):
+        """Number of removed documents still taking up space"""
+        return len(self._doc_titles) - len(self._doc_of)
+
+    def needs_compaction(self):
+        return self.dead > max(COMPACT_MIN_DEAD, len(self._doc_of))
+
+    def add(self, record):
+        """Index a record, replacing any record with the same title"""
+        title = record["title"]
+        self.remove(title)
+        doc_id = len(self._doc_titles)
+        self._doc_titles.append(title)
+        self._doc_of[title] = doc_id
+        _set_bit(self._live, doc_id)
+
+        self._titles.add(doc_id, set(WORD_PATTERN.findall(title.lower())))
+        self._text.add(doc_id, set(WORD_PATTERN.findall(record["template"].lower())))
+        _add_document(self._placeholders, set(record["placeholders"]), doc_id)
+
+    def remove(self, title):
+        doc_id = self._doc_of.pop(title, None)
+        if doc_id is not None:
+            self._doc_titles[doc_id] = None
+            self._live[doc_id >> 3] &= ~(1 << (doc_id & 7))
+
+    def rebuild(self, records):
+        """Index ``records`` from scratch, dropping removed documents"""
+        self._clear()
+        for record in records:
+            self.add(record)
+
+    def search(self, text, limit=200):
+        """Return up to ``limit`` titles matching a search, best first.
+
+        Every word must start a word of the title or template, and every
+        ``[placeholder]`` term must be a placeholder of the template.
+        Records with all the words in the title come first, then those
+        with some of them in the title, each group in the order the
+        records were indexed.
+        """
+        words, placeholders = parse_query(text)
+        if not words and not placeholders:
+            return []
+
+        matches = int.from_bytes(self._live, "little")
+        for name in placeholders:
+            matches &= _bitset(self._placeholders.get(name))
+        in_all_titles = matches
+        in_any_title = 0
+        for word in dict.fromkeys(words):
+            if not matches:
+                return []
+            in_title = self._titles.matching(word)
+            matches &= in_title | self._text.matching(word)
+            in_all_titles &= in_title
+            in_any_title |= in_title
+
+        best = in_all_titles & matches
+        good = in_any_title & matches & ~best
+        doc_ids = []
+        for tier in (best, good, matches & ~best & ~good):
+            doc_ids.extend(_first_ids(tier, limit - len(doc_ids)))
+            if len(doc_ids) >= limit:
+                break
+        return [self._doc_titles[doc_id] for doc_id in doc_ids]
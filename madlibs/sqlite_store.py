@@ -0,0 +1,382 @@
+"""SQLite storage for very large Mad Libs libraries.
+
+An alternative to the JSON snapshot and journal in storage.py with the
+same load/put/remove/flush/save surface. Each Mad Lib is one row; titles
+and placeholder names are indexed, and an FTS5 index over the title and
+template text backs search(). Nothing is loaded up front: lookups, list
+rows and search results are read from the database as they are needed,
+so a library of millions of templates opens instantly and uses little
+memory.
+
+Every put() and remove() is its own small transaction, committed
+straight away, so there is never anything waiting to be flushed.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from . import metrics
+from .search import parse_query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS madlibs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    template TEXT NOT NULL,
+    placeholders TEXT NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS madlib_placeholders (
+    name TEXT NOT NULL,
+    madlib_id INTEGER NOT NULL,
+    PRIMARY KEY (name, madlib_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS madlib_placeholders_madlib ON madlib_placeholders (madlib_id);
+-- Lets the list views page through titles without reading the templates
+CREATE INDEX IF NOT EXISTS madlibs_order ON madlibs (id, title);
+"""
+
+# Prefix indexes for 1-3 characters keep type-ahead searches for short
+# prefixes from merging the lists of every word they start
+FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS madlibs_fts USING fts5(
+    title, template, content='madlibs', content_rowid='id', prefix='1 2 3'
+)
+"""
+
+# Keep the full-text index in step with the madlibs table
+FTS_TRIGGERS = {
+    "madlibs_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS madlibs_fts_insert AFTER INSERT ON madlibs BEGIN
+            INSERT INTO madlibs_fts (rowid, title, template) VALUES (new.id, new.title, new.template);
+        END""",
+    "madlibs_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS madlibs_fts_delete AFTER DELETE ON madlibs BEGIN
+            INSERT INTO madlibs_fts (madlibs_fts, rowid, title, template)
+            VALUES ('delete', old.id, old.title, old.template);
+        END""",
+    "madlibs_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS madlibs_fts_update AFTER UPDATE ON madlibs BEGIN
+            INSERT INTO madlibs_fts (madlibs_fts, rowid, title, template)
+            VALUES ('delete', old.id, old.title, old.template);
+            INSERT INTO madlibs_fts (rowid, title, template) VALUES (new.id, new.title, new.template);
+        END""",
+}
+
+# Titles fetched at a time for the list views
+WINDOW_SIZE = 256
+
+# Rows fetched at a time when iterating over the whole library
+ITER_BATCH_SIZE = 1000
+
+# Title matches rank this many times higher than template matches
+TITLE_WEIGHT = 10.0
+
+# Searches with more matches than this are not ranked
+RANK_LIMIT = 5000
+
+_COLUMNS = "title, template, placeholders, extra"
+
+
+def _to_row(record):
+    extra = {key: value for key, value in record.items()
+             if key not in ("title", "template", "placeholders")}
+    return (record["title"], record["template"], json.dumps(record["placeholders"]),
+            json.dumps(extra) if extra else None)
+
+
+def _to_record(row):
+    title, template, placeholders, extra = row
+    record = {"title": title, "template": template, "placeholders": json.loads(placeholders)}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+
+def fts_query(words):
+    """An FTS5 query matching every word as a prefix"""
+    # parse_query() words never contain quotes, so quoting makes them safe
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class _TitleWindow:
+    """Titles in library order, read from the database a window at a time"""
+
+    def __init__(self, library):
+        self.library = library
+        self.start = 0
+        self.titles = []
+
+    def __len__(self):
+        return len(self.library)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.library)
+        if not 0 <= index < len(self.library):
+            raise IndexError("title index out of range")
+        if not self.start <= index < self.start + len(self.titles):
+            # Fetch a little before the index too, for scrolling up
+            self.start = max(0, index - WINDOW_SIZE // 4)
+            self.titles = self.library._query(
+                "SELECT title FROM madlibs ORDER BY id LIMIT ? OFFSET ?",
+                (WINDOW_SIZE, self.start), column=True)
+        return self.titles[index - self.start]
+
+    def clear(self):
+        """Forget the fetched titles after the library changed"""
+        self.titles = []
+
+
+class SQLiteLibrary:
+    """MadLibsLibrary look-alike whose records stay in a SQLite database.
+
+    Library order is insertion order (the row id). Positional access pages
+    through the titles with LIMIT/OFFSET, which the list views only do for
+    the few rows on screen.
+    """
+
+    # SQLite keeps the full-text index up to date itself
+    search_ready = True
+
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+        self._count = self._query("SELECT COUNT(*) FROM madlibs", column=True)[0]
+        self._titles = _TitleWindow(self)
+        self.has_fts = bool(self._query(
+            "SELECT 1 FROM sqlite_master WHERE name = 'madlibs_fts'"))
+
+    def _query(self, sql, parameters=(), column=False):
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        metrics.count("sqlite_queries")
+        return [row[0] for row in rows] if column else rows
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        last_id = 0
+        while True:
+            rows = self._query(f"SELECT id, {_COLUMNS} FROM madlibs WHERE id > ? ORDER BY id LIMIT ?",
+                               (last_id, ITER_BATCH_SIZE))
+            for row in rows:
+                yield _to_record(row[1:])
+            if len(rows) < ITER_BATCH_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def __contains__(self, title):
+        return bool(self._query("SELECT 1 FROM madlibs WHERE title = ?", (title,)))
+
+    def __getitem__(self, index):
+        return self.get(self._titles[index])
+
+    def get(self, title, default=None):
+        rows = self._query(f"SELECT {_COLUMNS} FROM madlibs WHERE title = ?", (title,))
+        return _to_record(rows[0]) if rows else default
+
+    def _write(self, record):
+        """Insert or update one record; call inside a transaction"""
+        row = _to_row(record)
+        found = self._connection.execute(
+            "SELECT id FROM madlibs WHERE title = ?", (record["title"],)).fetchone()
+        if found:
+            madlib_id = found[0]
+            self._connection.execute(
+                "UPDATE madlibs SET template = ?, placeholders = ?, extra = ? WHERE id = ?",
+                row[1:] + (madlib_id,))
+            self._connection.execute(
+                "DELETE FROM madlib_placeholders WHERE madlib_id = ?", (madlib_id,))
+        else:
+            madlib_id = self._connection.execute(
+                f"INSERT INTO madlibs ({_COLUMNS}) VALUES (?, ?, ?, ?)", row).lastrowid
+        self._connection.executemany(
+            "INSERT INTO madlib_placeholders (name, madlib_id) VALUES (?, ?)",
+            [(name, madlib_id) for name in dict.fromkeys(record["placeholders"])])
+        return found is None
+
+    def put(self, record):
+        """Insert or replace the record with the same title in one transaction.
+
+        Returns True if the title is new. An updated record keeps its
+        position.
+        """
+        with self._lock, self._connection:
+            is_new = self._write(record)
+        metrics.count("sqlite_writes")
+        if is_new:
+            self._count += 1
+            self._titles.clear()
+        return is_new
+
+    def remove(self, title):
+        """Remove and return the record with ``title``, or None."""
+        with self._lock, self._connection:
+            found = self._connection.execute(
+                f"SELECT id, {_COLUMNS} FROM madlibs WHERE title = ?", (title,)).fetchone()
+            if found is None:
+                return None
+            self._connection.execute("DELETE FROM madlibs WHERE id = ?", (found[0],))
+            self._connection.execute(
+                "DELETE FROM madlib_placeholders WHERE madlib_id = ?", (found[0],))
+        metrics.count("sqlite_writes")
+        self._count -= 1
+        self._titles.clear()
+        return _to_record(found[1:])
+
+    def replace_all(self, records):
+        """Replace the whole library with ``records`` in one transaction.
+
+        The full-text index is rebuilt once at the end, which is several
+        times faster than updating it row by row.
+        """
+        with self._lock, self._connection:
+            if self.has_fts:
+                for name in FTS_TRIGGERS:
+                    self._connection.execute(f"DROP TRIGGER {name}")
+            self._connection.execute("DELETE FROM madlib_placeholders")
+            self._connection.execute("DELETE FROM madlibs")
+            self._connection.executemany(
+                f"INSERT INTO madlibs ({_COLUMNS}) VALUES (?, ?, ?, ?) ON CONFLICT (title) DO UPDATE "
+                "SET template = excluded.template, placeholders = excluded.placeholders, "
+                "extra = excluded.extra", map(_to_row, records))
+            self._connection.execute(
+                "INSERT OR IGNORE INTO madlib_placeholders (name, madlib_id) "
+                "SELECT p.value, m.id FROM madlibs m, json_each(m.placeholders) p")
+            if self.has_fts:
+                self._connection.execute("INSERT INTO madlibs_fts (madlibs_fts) VALUES ('rebuild')")
+                for trigger in FTS_TRIGGERS.values():
+                    self._connection.execute(trigger)
+            self._count = self._connection.execute("SELECT COUNT(*) FROM madlibs").fetchone()[0]
+        self._titles.clear()
+        metrics.count("sqlite_writes", self._count)
+
+    def titles(self):
+        """Return a read-only sequence of the titles in library order."""
+        return self._titles
+
+    def index(self, title):
+        """Return the position of ``title`` in library order."""
+        found = self._query("SELECT id FROM madlibs WHERE title = ?", (title,), column=True)
+        if not found:
+            raise KeyError(title)
+        return self._query("SELECT COUNT(*) FROM madlibs WHERE id < ?", found, column=True)[0]
+
+    def to_list(self):
+        """Return the records as a plain list, as saved in madlibs.json."""
+        return list(self)
+
+    @metrics.timed("library.search")
+    def search(self, text, limit=200):
+        """Return up to ``limit`` titles matching a search, best first.
+
+        Words are looked up in the full-text index and ranked by BM25 with
+        title matches weighted up; ``[placeholder]`` terms use the
+        placeholder index. Ranking has to score every match, so a search
+        with more than RANK_LIMIT matches returns them in library order.
+        """
+        words, placeholders = parse_query(text)
+        if not words and not placeholders:
+            return []
+        parameters = []
+        if not words:
+            # Walk the first placeholder's index entries in library order
+            sql = ("SELECT m.title FROM madlib_placeholders p JOIN madlibs m ON m.id = p.madlib_id "
+                   "WHERE p.name = ?")
+            parameters.append(placeholders.pop(0))
+            order = "p.madlib_id"
+        elif self.has_fts:
+            match = fts_query(words)
+            sql = ("SELECT m.title FROM madlibs_fts f JOIN madlibs m ON m.id = f.rowid "
+                   "WHERE madlibs_fts MATCH ?")
+            parameters.append(match)
+            matches = self._query("SELECT COUNT(*) FROM (SELECT 1 FROM madlibs_fts "
+                                  "WHERE madlibs_fts MATCH ? LIMIT ?)",
+                                  (match, RANK_LIMIT + 1), column=True)[0]
+            # FTS5 returns rows in rowid order without sorting them
+            order = f"bm25(madlibs_fts, {TITLE_WEIGHT}, 1.0), f.rowid" if matches <= RANK_LIMIT else "f.rowid"
+        else:
+            # SQLite built without FTS5: slow substring search over titles
+            sql = "SELECT m.title FROM madlibs m WHERE 1"
+            for word in words:
+                sql += " AND m.title LIKE ?"
+                parameters.append(f"%{word}%")
+            order = "m.id"
+
+        for name in placeholders:
+            sql += " AND EXISTS (SELECT 1 FROM madlib_placeholders WHERE name = ? AND madlib_id = m.id)"
+            parameters.append(name)
+        parameters.append(limit)
+        return self._query(f"{sql} ORDER BY {order} LIMIT ?", parameters, column=True)
+
+
+class SQLiteStore:
+    """A library kept in a SQLite database, one row per Mad Lib.
+
+    If ``library`` is given, the database is overwritten with its records
+    (this is how Save As converts a library to SQLite).
+    """
+
+    def __init__(self, path, library=None):
+        self.path = path
+        self.loading = False
+        self._existed = os.path.exists(path)
+        self._lock = threading.RLock()
+        # Autosave calls flush() and save() from its own thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+            try:
+                self._connection.execute(FTS_TABLE)
+            except sqlite3.OperationalError:
+                # Python's SQLite was built without FTS5
+                pass
+            else:
+                for trigger in FTS_TRIGGERS.values():
+                    self._connection.execute(trigger)
+        self.library = SQLiteLibrary(self._connection, self._lock)
+        if library is not None:
+            self.library.replace_all(library)
+
+    def exists(self):
+        return self._existed or len(self.library) > 0
+
+    @metrics.timed("store.load")
+    def load(self):
+        """Return the library; its records are read on demand."""
+        return self.library
+
+    def iter_load(self, batch_size=1000):
+        """Nothing to load in batches; the returned generator is empty."""
+        return iter(())
+
+    @property
+    def dirty(self):
+        """Always False: every change is committed straight away."""
+        return False
+
+    def put(self, record):
+        """Add or update a record. Returns True if new."""
+        return self.library.put(record)
+
+    def remove(self, title):
+        """Remove a record by title."""
+        return self.library.remove(title)
+
+    def flush(self):
+        """Nothing to do, changes are already committed."""
+
+    @metrics.timed("store.save")
+    def save(self):
+        """Checkpoint the write-ahead log into the database file."""
+        with self._lock:
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,360 @@
+"""Persistent storage for a Mad Libs library.
+
+The library is kept as a JSON snapshot (the familiar madlibs.json) plus a
+journal file next to it. Every change is appended to the journal as one
+JSON line, so a single edit costs a few hundred bytes of I/O no matter how
+big the library is. Once the journal grows large enough it is folded into
+a new snapshot, which is written atomically.
+
+Changes are buffered in memory until flush() is called, which lets the GUI
+batch bursts of edits and do the disk work on a background thread (see
+autosave.py).
+"""
+import errno
+import json
+import os
+import re
+import tempfile
+import threading
+
+from . import metrics
+from .library import MadLibsLibrary
+from .records import to_json
+
+# Never compact a journal smaller than this
+COMPACT_BYTES = 1024 * 1024
+
+# How much of a snapshot to read at a time when streaming it
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Copying a library reports progress every this many records
+PROGRESS_RECORDS = 10000
+
+# Files with these extensions are SQLite databases (see sqlite_store.py)
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+_WHITESPACE = re.compile(r'\s*')
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+def iter_json_array(file, chunk_size=READ_CHUNK_SIZE):
+    """Yield the items of a top-level JSON array one at a time.
+
+    Only about one chunk of the file is held in memory at once, so very
+    large libraries can be loaded without first reading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or not fill():
+                return
+
+    def expect(chars):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] not in chars:
+            found = buffer[pos:pos + 1] or "end of file"
+            raise ValueError(f"Expected one of {chars!r} in JSON array, found {found!r}")
+        pos += 1
+        return buffer[pos - 1]
+
+    expect("[")
+    skip_whitespace()
+    if buffer[pos:pos + 1] == "]":
+        return
+
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the item continues in the next chunk
+                if not fill():
+                    raise
+                continue
+            if (end == len(buffer) or buffer[end] in _NUMBER_CHARS) and not eof and fill():
+                # A number could continue in the next chunk, decode again
+                continue
+            break
+        pos = end
+        yield item
+        if expect(",]") == "]":
+            return
+
+
+def atomic_write_json(path, data, indent=2, default=to_json):
+    """Write ``data`` as JSON to ``path`` without ever leaving a partial file.
+
+    The data goes to a temporary file in the same directory, which is
+    flushed and fsynced before being renamed over ``path``. ``default``
+    converts objects json does not know, MadLibRecords by default.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".madlibs-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, indent=indent, default=default)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def is_sqlite_path(path):
+    return path.lower().endswith(SQLITE_EXTENSIONS)
+
+
+def needs_copy(path, library):
+    """Whether saving ``library`` to ``path`` copies every record, or just
+    takes the in-memory library over"""
+    return is_sqlite_path(path) or not isinstance(library, MadLibsLibrary)
+
+
+def open_store(path, library=None, searchable=False, create=True, progress=None):
+    """Return the store for ``path``, picking the backend by file extension.
+
+    SQLite databases get a SQLiteStore, anything else a JournaledStore.
+    ``library`` is the library to save there, as for Save As; if it has
+    to be copied (see needs_copy), ``progress`` is called now and then
+    with the number of records copied so far. ``searchable`` asks for an
+    in-memory search index when the records are held in memory; SQLite
+    always has its full-text index. With ``create`` false, a library
+    that does not exist yet raises FileNotFoundError instead of being
+    created.
+    """
+    if not create and not (os.path.exists(path) or os.path.exists(path + ".journal")):
+        raise FileNotFoundError(errno.ENOENT, "No saved library", path)
+    if library is not None and progress is not None and needs_copy(path, library):
+        library = _reporting(library, progress)
+    if is_sqlite_path(path):
+        from .sqlite_store import SQLiteStore
+
+        return SQLiteStore(path, library)
+    if library is not None and not isinstance(library, MadLibsLibrary):
+        # Records from another backend have to be held in memory here
+        library = MadLibsLibrary(library, searchable=searchable)
+    return JournaledStore(path, library, searchable=searchable)
+
+
+def _reporting(records, progress, every=PROGRESS_RECORDS):
+    count = 0
+    for count, record in enumerate(records, 1):
+        yield record
+        if count % every == 0:
+            progress(count)
+    if count % every:
+        progress(count)
+
+
+class JournaledStore:
+    """A library persisted as a JSON snapshot plus an append-only journal.
+
+    Loaded libraries are ``searchable`` (see MadLibsLibrary) if asked.
+    """
+
+    def __init__(self, path, library=None, compact_bytes=COMPACT_BYTES, searchable=False):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.searchable = searchable
+        self.library = library if library is not None else MadLibsLibrary(searchable=searchable)
+        self.compact_bytes = compact_bytes
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        self._pending = []
+        self.loading = False
+        # _lock guards the library and pending changes, _io_lock the files
+        self._lock = threading.Lock()
+        self._io_lock = threading.RLock()
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    @metrics.timed("store.load")
+    def load(self):
+        """Read the snapshot, replay the journal and return the library."""
+        for _ in self.iter_load():
+            pass
+        return self.library
+
+    def iter_load(self, batch_size=1000):
+        """Load the library incrementally.
+
+        ``self.library`` is replaced by a new, empty library straight away
+        and filled as the returned generator is consumed. Each step yields
+        the list of records just added; the journal is replayed after the
+        last batch.
+        """
+        self.library = MadLibsLibrary(searchable=self.searchable)
+        return self._load_batches(batch_size)
+
+    def _load_batches(self, batch_size):
+        self.loading = True
+        try:
+            self._snapshot_bytes = 0
+            if os.path.exists(self.path):
+                self._snapshot_bytes = os.path.getsize(self.path)
+                with open(self.path, "r") as file:
+                    batch = []
+                    for record in iter_json_array(file):
+                        batch.append(record)
+                        if len(batch) >= batch_size:
+                            yield self._add_batch(batch)
+                            batch = []
+                    if batch:
+                        yield self._add_batch(batch)
+                metrics.count("bytes_read", self._snapshot_bytes)
+            with self._io_lock:
+                self._replay_journal()
+        finally:
+            self.loading = False
+
+    def _add_batch(self, batch):
+        with self._lock:
+            for record in batch:
+                self.library.put(record)
+        return batch
+
+    def _replay_journal(self):
+        self._journal_bytes = 0
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, "rb") as file:
+            data = file.read()
+        metrics.count("bytes_read", len(data))
+        lines = data.splitlines(keepends=True)
+        valid_bytes = 0
+        for i, line in enumerate(lines):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("partial line")
+                entry = json.loads(line)
+            except ValueError:
+                if i == len(lines) - 1:
+                    # A crash while appending can leave a partial last line;
+                    # cut it off so new entries start on a fresh line
+                    with open(self.journal_path, "r+b") as file:
+                        file.truncate(valid_bytes)
+                    break
+                raise ValueError(f"Corrupt journal entry on line {i + 1} of {self.journal_path}")
+            self._apply(entry)
+            valid_bytes += len(line)
+        self._journal_bytes = valid_bytes
+
+    def _apply(self, entry):
+        if entry["op"] == "put":
+            self.library.put(entry["record"])
+        elif entry["op"] == "delete":
+            self.library.remove(entry["title"])
+
+    @property
+    def dirty(self):
+        """True if there are changes that have not been flushed yet."""
+        return bool(self._pending)
+
+    def put(self, record):
+        """Add or update a record and queue the change. Returns True if new."""
+        with self._lock:
+            is_new = self.library.put(record)
+            self._pending.append({"op": "put", "record": record})
+        return is_new
+
+    def remove(self, title):
+        """Remove a record by title and queue the change."""
+        with self._lock:
+            record = self.library.remove(title)
+            if record is not None:
+                self._pending.append({"op": "delete", "title": title})
+        return record
+
+    @metrics.timed("store.flush")
+    def flush(self):
+        """Append queued changes to the journal, compacting if it got too big.
+
+        Safe to call from a background thread.
+        """
+        with self._io_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return
+
+            data = "".join(json.dumps(entry, default=to_json) + "\n" for entry in entries)
+            data = data.encode("utf-8")
+            start = None
+            try:
+                with open(self.journal_path, "ab") as file:
+                    start = file.seek(0, os.SEEK_END)
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+            except OSError:
+                if start is not None:
+                    # Cut off whatever part of the entries made it to disk
+                    # (disk full, ...), so the retry starts on a fresh line
+                    try:
+                        os.truncate(self.journal_path, start)
+                    except OSError:
+                        pass
+                # Keep the changes queued so the next flush retries them
+                with self._lock:
+                    self._pending[:0] = entries
+                raise
+            written = len(data)
+            self._journal_bytes += written
+            metrics.count("bytes_written", written)
+
+            too_big = self._journal_bytes > max(self.compact_bytes, self._snapshot_bytes // 2)
+            if too_big and not self.loading:
+                self.save()
+
+    def close(self):
+        """Nothing to release; pending changes are kept until the next flush."""
+
+    @metrics.timed("store.save")
+    def save(self):
+        """Write a full snapshot and clear the journal (compaction).
+
+        Safe to call from a background thread.
+        """
+        if self.loading:
+            raise RuntimeError("Cannot save while the library is still loading")
+        with self._io_lock:
+            with self._lock:
+                # The snapshot includes every queued change
+                entries, self._pending = self._pending, []
+                records = self.library.to_list()
+            try:
+                atomic_write_json(self.path, records)
+            except OSError:
+                # Keep the changes queued so a later flush or save writes them
+                with self._lock:
+                    self._pending[:0] = entries
+                raise
+            self._snapshot_bytes = os.path.getsize(self.path)
+            metrics.count("bytes_written", self._snapshot_bytes)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_bytes = 0
@@ -0,0 +1,171 @@
+"""Watchdog that catches event-loop stalls in the GUI.
+
+A heartbeat callback is scheduled on the Tk thread every ``interval``
+seconds and measures how late it runs (the event-loop lag). A helper
+thread watches the heartbeat; when it is more than ``threshold`` late,
+the helper samples the Tk thread's Python stack to find out which
+callback is blocking it. Every stall is recorded with that callback, a
+stack sample and how long the loop was blocked.
+
+Works with anything that has a Tk-style ``after(ms, func)`` and does not
+import tkinter itself.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from . import metrics
+
+# Frames from these files are Tk's event dispatch, not application code
+_TKINTER_DIR = os.sep + "tkinter" + os.sep
+
+
+def _frames(frame):
+    """The frames of a stack, outermost first"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _describe(frame):
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {name}"
+
+
+def callback_name(frames):
+    """Name the Tk callback that is running in a stack (outermost first).
+
+    That is the first application frame called from tkinter's dispatch
+    code. If the stack ends inside tkinter, Tk itself is busy (drawing,
+    layout or a blocking Tk call).
+    """
+    dispatched = False
+    for frame in frames:
+        if _TKINTER_DIR in frame.f_code.co_filename:
+            dispatched = True
+        elif dispatched:
+            code = frame.f_code
+            return getattr(code, "co_qualname", code.co_name)
+    return "<Tk event loop>"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class StallWatchdog:
+    """Measure event-loop lag and record stalls longer than ``threshold`` seconds."""
+
+    def __init__(self, schedule, threshold=0.2, interval=0.05, sample_interval=0.02,
+                 max_lags=10000, on_stall=None):
+        self.schedule = schedule
+        self.threshold = threshold
+        self.interval = interval
+        self.sample_interval = sample_interval
+        # Called on the Tk thread with each finished stall record
+        self.on_stall = on_stall
+        self.lags = deque(maxlen=max_lags)
+        self.stalls = []
+        self._current = None  # the stall in progress, opened by the helper thread
+        self._expected = None  # when the next heartbeat should run
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop_thread_id = None
+
+    def start(self):
+        """Start watching; call from the Tk thread"""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._expected = time.perf_counter() + self.interval
+        self.schedule(int(self.interval * 1000), self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="madlibs-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _heartbeat(self):
+        if self._stop.is_set():
+            return
+        now = time.perf_counter()
+        lag = max(0.0, now - self._expected)
+        self.lags.append(lag)
+        metrics.observe("ui.lag", lag)
+
+        with self._lock:
+            stall, self._current = self._current, None
+            if stall is None and lag > self.threshold:
+                # Too short for the helper thread to sample
+                stall = {"callback": None, "stack": [], "samples": {}}
+            self._expected = now + self.interval
+        if stall is not None:
+            stall["lag_seconds"] = lag
+            stall["ended_at"] = time.time()
+            self.stalls.append(stall)
+            metrics.count("ui_stalls")
+            if self.on_stall:
+                self.on_stall(stall)
+        self.schedule(int(self.interval * 1000), self._heartbeat)
+
+    def _watch(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                late = time.perf_counter() - self._expected
+                if late <= self.threshold:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                frames = _frames(frame)
+                innermost = _describe(frames[-1])
+                if self._current is None:
+                    self._current = {
+                        "callback": callback_name(frames),
+                        "stack": [_describe(f) for f in frames],
+                        "samples": Counter(),
+                    }
+                # Where the blocked thread is at each sample shows where the time goes
+                self._current["samples"][innermost] += 1
+                del frame, frames
+
+    def report(self):
+        """Stall count, lag percentiles and the callbacks that stalled"""
+        lags = sorted(self.lags)
+        by_callback = Counter(stall["callback"] or "<unknown>" for stall in self.stalls)
+        return {
+            "heartbeats": len(lags),
+            "stalls": len(self.stalls),
+            "lag_p50_ms": percentile(lags, 0.50) * 1000,
+            "lag_p95_ms": percentile(lags, 0.95) * 1000,
+            "lag_p99_ms": percentile(lags, 0.99) * 1000,
+            "lag_max_ms": (lags[-1] if lags else 0.0) * 1000,
+            "stalls_by_callback": dict(by_callback.most_common()),
+            "stall_records": [dict(stall, samples=dict(stall["samples"])) for stall in self.stalls],
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = [
+            f"{report['stalls']} stalls over {self.threshold * 1000:.0f} ms "
+            f"in {report['heartbeats']} heartbeats",
+            f"event-loop lag: p50 {report['lag_p50_ms']:.1f} ms, p95 {report['lag_p95_ms']:.1f} ms, "
+            f"p99 {report['lag_p99_ms']:.1f} ms, max {report['lag_max_ms']:.1f} ms",
+        ]
+        for callback, count in report["stalls_by_callback"].items():
+            worst = max(stall["lag_seconds"] for stall in self.stalls
+                        if (stall["callback"] or "<unknown>") == callback)
+            lines.append(f"  {count:5d} x {callback} (worst {worst * 1000:.0f} ms)")
+        return "\n".join(lines)
@@ -0,0 +1,160 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from madlibs import ai_cache
+from madlibs.ai import (AIClient, AIError, CircuitBreaker, CircuitOpenError, TemplateExtractor,
+                        TemplateParseError, parse_template)
+
+TEMPLATE = {"title": "Zoo Day", "template": "A [animal] ate {the} [food].",
+            "placeholders": ["animal", "food"]}
+ANSWER = 'Sure :{ here it is: ' + json.dumps(TEMPLATE) + ' Enjoy {it}!'
+
+
+def feed_in_chunks(text, size):
+    extractor = TemplateExtractor()
+    for start in range(0, len(text), size):
+        extractor.feed(text[start:start + size])
+    return extractor.finish()
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, 1000])
+def test_extractor_streams_at_any_chunk_size(size):
+    assert feed_in_chunks(ANSWER, size) == TEMPLATE
+
+
+ESCAPED = {"title": "Escapes \" } {", "template": "[a]", "placeholders": ["a"]}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"data": ' + json.dumps(TEMPLATE) + '}', TEMPLATE),
+    ('He said "{" and ' + json.dumps(TEMPLATE), TEMPLATE),
+    ('{"title": null, "template": 5, "placeholders": [{"name": "x"}]} ' + json.dumps(TEMPLATE), TEMPLATE),
+    (json.dumps(ESCAPED), ESCAPED),
+])
+def test_extractor_finds_the_template(text, expected):
+    assert parse_template(text) == expected
+
+
+def test_extractor_errors():
+    with pytest.raises(TemplateParseError, match="No template JSON"):
+        parse_template("no braces at all")
+    with pytest.raises(TemplateParseError, match="Missing required fields"):
+        parse_template('{"title": "T", "placeholders": []}')
+
+
+def test_breaker_lets_one_trial_call_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("madlibs.ai.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.retry_in() == 0
+    breaker.record_failure()
+    assert breaker.retry_in() == 10
+
+    now[0] += 10
+    assert breaker.retry_in() == 0
+    assert breaker.retry_in() == 10
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.retry_in() == 0
+    breaker.record_success()
+    assert breaker.retry_in() == 0
+    assert breaker.retry_in() == 0
+
+
+class StubAPI:
+    """A local chat completions server answering from a list of (status, body)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                stub.calls += 1
+                status, body = stub.responses.pop(0) if stub.responses else (500, {})
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def completion(content):
+    return 200, {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 10}}
+
+
+@pytest.fixture
+def stub_api():
+    pytest.importorskip("requests")
+    stubs = []
+
+    def start(*responses):
+        stub = StubAPI(responses)
+        stubs.append(stub)
+        return stub
+
+    yield start
+    for stub in stubs:
+        stub.close()
+
+
+def generate(client):
+    return client.generate_template("key", "a zoo", "Medium", "Funny", cache_mode=ai_cache.BYPASS)
+
+
+def test_client_retries_rate_limits_and_server_errors(stub_api):
+    stub = stub_api((429, {"error": {"message": "slow down"}}), (503, {}), completion(ANSWER))
+    client = AIClient(endpoint=stub.url, backoff_base=0)
+    try:
+        assert generate(client) == TEMPLATE
+    finally:
+        client.close()
+    assert stub.calls == 3
+
+
+def test_client_does_not_retry_a_bad_key(stub_api):
+    stub = stub_api((401, {"error": {"message": "bad key"}}), completion(ANSWER))
+    client = AIClient(endpoint=stub.url, backoff_base=0)
+    try:
+        with pytest.raises(AIError):
+            generate(client)
+    finally:
+        client.close()
+    assert stub.calls == 1
+
+
+def test_client_fails_fast_once_the_breaker_opens(stub_api):
+    stub = stub_api(*[(500, {})] * 10)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    client = AIClient(endpoint=stub.url, backoff_base=0, max_retries=5, breaker=breaker)
+    try:
+        with pytest.raises(AIError):
+            generate(client)
+        assert stub.calls == 3
+        with pytest.raises(CircuitOpenError):
+            generate(client)
+    finally:
+        client.close()
+    assert stub.calls == 3
@@ -0,0 +1,35 @@
+import json
+import os
+
+from madlibs.catalog import TemplateCatalog
+
+
+def write_template(path, template, mtime_ns=None):
+    with open(path, "w") as file:
+        json.dump({"title": "Zoo", "template": template, "placeholders": ["animal"]}, file)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_entries_pick_up_a_template_edited_in_place(tmp_path):
+    path = tmp_path / "zoo.json"
+    write_template(path, "A [animal] at the zoo.", mtime_ns=1_000_000_000)
+    catalog = TemplateCatalog(str(tmp_path))
+    assert catalog.entries()[0].preview == "A [animal] at the zoo."
+
+    dir_mtime_ns = os.stat(tmp_path).st_mtime_ns
+    write_template(path, "Two [animal]s at the zoo!", mtime_ns=2_000_000_000)
+    assert os.stat(tmp_path).st_mtime_ns == dir_mtime_ns
+
+    assert catalog.entries()[0].preview == "Two [animal]s at the zoo!"
+    assert catalog.load("zoo.json")["template"] == "Two [animal]s at the zoo!"
+
+
+def test_entries_drop_a_removed_template(tmp_path):
+    write_template(tmp_path / "zoo.json", "A [animal].")
+    write_template(tmp_path / "farm.json", "A [animal].")
+    catalog = TemplateCatalog(str(tmp_path))
+    assert [entry.filename for entry in catalog.entries()] == ["farm.json", "zoo.json"]
+
+    os.remove(tmp_path / "farm.json")
+    assert [entry.filename for entry in catalog.entries()] == ["zoo.json"]
@@ -0,0 +1,33 @@
+from madlibs.library import MadLibsLibrary
+
+
+def record(title, template):
+    return {"title": title, "template": template, "placeholders": ["noun"]}
+
+
+def library_of(count):
+    return MadLibsLibrary((record(f"Story {i}", f"The [noun] number {i} went home.")
+                           for i in range(count)), searchable=True)
+
+
+def test_first_search_builds_the_index():
+    library = library_of(10)
+    assert library.search("story 3") == ["Story 3"]
+    library.put(record("Zebra Tale", "A [noun] with stripes."))
+    assert library.search("stripes") == ["Zebra Tale"]
+
+
+def test_changes_during_a_background_build_reach_the_index():
+    library = library_of(20000)
+    thread = library.build_search_index(background=True)
+    library.put(record("Late Arrival", "A [noun] came after indexing began."))
+    library.remove("Story 7")
+    library.put(record("Story 8", "Rewritten [noun] about a walrus."))
+    # Scans until the index is ready
+    assert library.search("walrus") == ["Story 8"]
+    thread.join()
+
+    assert library.search("late arrival") == ["Late Arrival"]
+    assert "Story 7" not in library.search("story 7", limit=100000)
+    assert library.search("walrus") == ["Story 8"]
+    assert "Story 8" not in library.search("number 8", limit=100000)
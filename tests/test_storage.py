@@ -0,0 +1,149 @@
+import errno
+import io
+import json
+import os
+
+import pytest
+
+from madlibs import storage
+from madlibs.storage import JournaledStore, iter_json_array
+
+
+def record(title, template="A [noun] went [verb]."):
+    return {"title": title, "template": template, "placeholders": ["noun", "verb"]}
+
+
+class _DiskFull:
+    """A file that writes half of what it is given, then fails"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def write(self, data):
+        self.file.write(data[:len(data) // 2])
+        self.file.flush()
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+
+def test_failed_journal_append_leaves_no_partial_line(tmp_path, monkeypatch):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path)
+    store.put(record("First"))
+    store.flush()
+
+    store.put(record("Second"))
+    monkeypatch.setattr(storage, "open", lambda *args: _DiskFull(open(*args)), raising=False)
+    with pytest.raises(OSError):
+        store.flush()
+    monkeypatch.undo()
+    assert store.dirty
+
+    store.flush()
+    store.put(record("Third"))
+    store.flush()
+
+    with open(store.journal_path) as file:
+        for line in file:
+            json.loads(line)
+    assert JournaledStore(path).load().titles() == ["First", "Second", "Third"]
+
+
+def test_journal_replays_puts_and_deletes(tmp_path):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path)
+    store.put(record("First"))
+    store.put(record("Second"))
+    store.flush()
+    store.put(record("First", "An updated [noun] did [verb]."))
+    store.remove("Second")
+    store.flush()
+    assert not os.path.exists(path)
+
+    library = JournaledStore(path).load()
+    assert library.titles() == ["First"]
+    assert library.get("First")["template"] == "An updated [noun] did [verb]."
+
+
+def test_partial_last_journal_line_is_cut_off(tmp_path):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path)
+    store.put(record("Kept"))
+    store.flush()
+    with open(store.journal_path, "a") as file:
+        file.write('{"op": "put", "record": {"title": "Torn')
+
+    reloaded = JournaledStore(path)
+    assert reloaded.load().titles() == ["Kept"]
+    reloaded.put(record("After"))
+    reloaded.flush()
+    assert JournaledStore(path).load().titles() == ["Kept", "After"]
+
+
+def test_corrupt_journal_line_before_the_last_is_an_error(tmp_path):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path)
+    store.put(record("First"))
+    store.flush()
+    with open(store.journal_path, "a") as file:
+        file.write("not json\n")
+    store.put(record("Second"))
+    store.flush()
+
+    with pytest.raises(ValueError, match="line 2"):
+        JournaledStore(path).load()
+
+
+def test_big_journal_is_compacted_into_the_snapshot(tmp_path):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path, compact_bytes=2000)
+    for i in range(50):
+        store.put(record(f"Story {i}"))
+        store.flush()
+    # Folded into a snapshot at least once, and small again since then
+    assert os.path.exists(path)
+    if os.path.exists(store.journal_path):
+        limit = max(2000, os.path.getsize(path) // 2)
+        assert os.path.getsize(store.journal_path) <= limit
+
+    assert JournaledStore(path).load().titles() == [f"Story {i}" for i in range(50)]
+
+
+def test_save_writes_a_snapshot_and_clears_the_journal(tmp_path):
+    path = str(tmp_path / "madlibs.json")
+    store = JournaledStore(path)
+    store.put(record("First"))
+    store.flush()
+    store.put(record("Second"))
+    store.save()
+
+    assert not os.path.exists(store.journal_path)
+    assert not store.dirty
+    with open(path) as file:
+        assert [item["title"] for item in json.load(file)] == ["First", "Second"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_iter_json_array_across_chunk_boundaries(chunk_size):
+    items = [12345, -0.5e-3, "a ] b , [ c", {"nested": [1, [2, 3]], "s": "\"}"}, True, None, [], {}, 6789]
+    text = " [ " + " , ".join(json.dumps(item) for item in items) + " ]\n"
+    assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == items
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]  ", "[\n]"])
+def test_iter_json_array_empty(text):
+    assert list(iter_json_array(io.StringIO(text), chunk_size=1)) == []
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1, 2", "[1 2]"])
+def test_iter_json_array_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), chunk_size=2))